@@ -1,32 +1,60 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request, g, stream_with_context
 from spelling_bee import SpellingBeeGame
+from sessions import SessionStore, SESSION_COOKIE
+from jobs import JobManager
+import math
 import threading
 
+# Automatic re-listens after "didn't hear anything" before giving up
+MAX_LISTEN_RETRIES = 3
+# Long-poll window for /api/listen/<job_id>, in seconds
+LISTEN_WAIT = 25
+MAX_LISTEN_WAIT = 60
+
 app = Flask(__name__)
+# Shared, read-mostly state: word catalog, context cache, LLM client, prefetcher
 game = SpellingBeeGame()
+# Microphone capture + recognition runs here, not on HTTP worker threads
+listen_jobs = JobManager()
+# Per-browser state: queue cursor, score, current word, filters; evicted players stop listening
+sessions = SessionStore(game, on_close=lambda player: listen_jobs.cancel_owner(player.id))
+
+def current_player():
+    """Returns the caller's PlayerSession, creating one if the cookie is missing or expired."""
+    if 'player' not in g:
+        g.player = sessions.get(request.cookies.get(SESSION_COOKIE))
+    return g.player
 
-# Store current word and details in memory for the session
-current_word = None
-current_details = None
-speech_lock = threading.Lock()
+@app.after_request
+def set_session_cookie(response):
+    player = g.get('player')
+    if player is not None and request.cookies.get(SESSION_COOKIE) != player.id:
+        response.set_cookie(SESSION_COOKIE, player.id, httponly=True, samesite='Lax')
+    return response
 
-def speak_async(text):
+def speak_async(player, text):
     """Speaks text in a background thread to avoid blocking the web response."""
-    # Acquire lock in main thread immediately to prevent listener from jumping in
-    speech_lock.acquire()
+    # Counted before the thread starts, so a listener submitted right after waits for this prompt
+    player.speech_queued()
+    player.events.publish('speaking_started', {'text': text})
     def run_speech():
         try:
-            game.speak(text)
+            with player.speech_lock:
+                game.speak(text)
         finally:
-            speech_lock.release()
+            player.speech_finished()
+            player.events.publish('speaking_done', {'text': text})
     threading.Thread(target=run_speech, daemon=True).start()
 
-@app.route('/api/wait_for_speech', methods=['GET'])
-def wait_for_speech():
-    """Blocks until any ongoing speech is finished."""
-    with speech_lock:
-        pass
-    return jsonify({'status': 'done'})
+@app.route('/api/events', methods=['GET'])
+def events():
+    """Server-Sent Events stream: speaking_started, speaking_done, listening, hint and result."""
+    player = current_player()
+    return Response(
+        stream_with_context(player.events.stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/')
 def index():
@@ -39,70 +67,91 @@ def check_started():
 
 @app.route('/api/next_word', methods=['POST'])
 def next_word():
-    global current_word, current_details
-    current_word = game.get_next_word()
+    """Serves the next word, speaks it and (unless {"listen": false}) starts listening for the answer."""
+    player = current_player()
+    data = request.get_json(silent=True) or {}
+    # A listen job still waiting on the previous word is no longer wanted
+    listen_jobs.cancel_owner(player.id)
+    with player.lock:
+        current_word = player.get_next_word()
+        if current_word:
+            # Filled in field by field while the context streams in; hints use whatever has arrived
+            details = player.current_details = {}
     if current_word:
-        # Get context (meaning, origin, sentence)
-        current_details = game.get_context(current_word)
-        
+        threading.Thread(target=load_context, args=(current_word, details), daemon=True).start()
         # Speak the word on the server
-        speak_async(f"The word is {current_word}. Please spell {current_word}")
+        speak_async(player, f"The word is {current_word}. Please spell {current_word}")
+        if data.get('listen', True):
+            # Waits for the queued prompt, so capture starts as soon as it has been spoken
+            start_listening(player)
         
         return jsonify({
             'word': current_word, 
             'status': 'spoken',
-            'score': game.score
+            'score': player.score
         })
     else:
         return jsonify({'error': 'No words left'}), 404
 
+def load_context(word, details):
+    """Gets the word's context (meaning, origin, sentence) into `details` without blocking the prompt."""
+    details.update(game.get_context(word, on_field=details.__setitem__))
+
 @app.route('/api/repeat_word', methods=['POST'])
 def repeat_word():
-    global current_word
-    if current_word:
-        speak_async(f"Please spell {current_word}")
+    player = current_player()
+    if player.current_word:
+        speak_async(player, f"Please spell {player.current_word}")
         return jsonify({'status': 'repeated'})
     return jsonify({'error': 'No active word'}), 400
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Returns context cache, TTS cache, LLM client, prefetch and session counters."""
+    return jsonify({
+        'context_cache': game.context_cache.stats,
+        'llm': game.client.snapshot() if game.client else None,
+        'tts_cache': game.tts.cache.snapshot() if game.tts else None,
+        'prefetch': game.prefetcher.snapshot(),
+        'sessions': sessions.snapshot(),
+        'listen_jobs': listen_jobs.snapshot()
+    })
+
 @app.route('/api/filters', methods=['GET'])
 def get_filters():
     """Returns unique Year, List, and Difficulty options for metadata."""
-    return jsonify(game.get_filter_metadata())
+    player = current_player()
+    game.catalog.refresh_if_stale()
+    return jsonify(game.catalog.metadata(player.filters))
 
 @app.route('/api/update_filters', methods=['POST'])
 def update_filters():
-    """Updates the game word filters (Year, List, Difficulty)."""
-    from flask import request
+    """Updates the player's word filters (Year, List, Difficulty)."""
+    player = current_player()
     data = request.json
-    game.set_filters(
-        year=data.get('year'),
-        list_type=data.get('list'),
-        difficulty=data.get('difficulty')
-    )
+    with player.lock:
+        player.set_filters(
+            year=data.get('year'),
+            list_type=data.get('list'),
+            difficulty=data.get('difficulty')
+        )
     return jsonify({
         'status': 'ok',
-        'word_count': len(game.words),
-        'filters': game.filters
+        'word_count': len(player.queue),
+        'filters': player.filters
     })
 
 @app.route('/api/set_order', methods=['POST'])
 def set_order():
-    from flask import request
+    player = current_player()
     data = request.json
     order = data.get('order', 'random')
-    game.set_order(order)
+    with player.lock:
+        player.set_order(order)
     return jsonify({'status': 'ok', 'order': order})
 
-@app.route('/api/listen', methods=['POST'])
-def listen():
-    global current_word, current_details
-    if not current_word:
-         return jsonify({'error': 'No active word'}), 400
-         
-    # Wait for any ongoing speech to finish before listening
-    with speech_lock:
-        user_text = game.listen_and_recognize()
-    
+def interpret_transcript(player, current_word, current_details, user_text):
+    """Turns a recognized transcript into a hint, command or graded spelling result."""
     if user_text:
         text_lower = user_text.lower()
         print(f"Debug - Heard: '{user_text}'")
@@ -110,82 +159,150 @@ def listen():
         # Check for hint keywords
         if "meaning" in text_lower or "definition" in text_lower:
             hint = current_details.get('meaning', 'No meaning available.')
-            speak_async(f"The meaning is: {hint}")
-            return jsonify({'result': 'hint', 'type': 'meaning', 'text': hint})
+            speak_async(player, f"The meaning is: {hint}")
+            return {'result': 'hint', 'type': 'meaning', 'text': hint}
         
         elif "origin" in text_lower or "root" in text_lower:
             hint = current_details.get('origin', 'No origin available.')
-            speak_async(f"The origin is: {hint}")
-            return jsonify({'result': 'hint', 'type': 'origin', 'text': hint})
+            speak_async(player, f"The origin is: {hint}")
+            return {'result': 'hint', 'type': 'origin', 'text': hint}
             
         elif "sentence" in text_lower or "example" in text_lower:
             hint = current_details.get('sentence', 'No example sentence available.')
-            speak_async(f"The sentence is: {hint}")
-            return jsonify({'result': 'hint', 'type': 'sentence', 'text': hint})
+            speak_async(player, f"The sentence is: {hint}")
+            return {'result': 'hint', 'type': 'sentence', 'text': hint}
 
         # 1. Check for Pause/Stop (highest priority)
         if any(kw in text_lower for kw in ["pause", "stop", "wait", "hold on"]):
             print(f"Debug - Pause triggered by: '{text_lower}'")
-            speak_async("Pausing. Click Resume to continue.")
-            return jsonify({'result': 'paused'})
+            speak_async(player, "Pausing. Click Resume to continue.")
+            return {'result': 'paused'}
 
         # 2. Check for Standalone Commands (pure instructions)
         command_kws = ["repeat", "word again", "say the word again", "say the word", "repeat the word", "repeat word", "the word"]
         clean_text = text_lower.replace("please", "").replace("can you", "").strip()
         
         if any(clean_text == kw for kw in command_kws):
-            speak_async(f"The word is {current_word}. Please spell {current_word}")
-            return jsonify({'result': 'hint', 'type': 'repeat', 'text': f"Repeating: {current_word}"})
+            speak_async(player, f"The word is {current_word}. Please spell {current_word}")
+            return {'result': 'hint', 'type': 'repeat', 'text': f"Repeating: {current_word}"}
 
-        # 3. Robust Extraction for "Word [Spelling] Word" format
-        target = current_word.lower().strip()
-        # Remove target word from start and end if present
-        # We use split/join to handle words that might appear multiple times or as part of others
+        # 3. Robust Extraction for "Word [Spelling] Word" format (letter names, homophones, fillers)
         words_heard = text_lower.split()
-        
-        # Try to find the target word at the very beginning and very end
-        start_idx = 0
-        end_idx = len(words_heard)
-        
-        if words_heard and words_heard[0] == target:
-            start_idx = 1
-        if len(words_heard) > 1 and words_heard[-1] == target:
-            end_idx = len(words_heard) - 1
-            
-        # The content in between is the spelling attempt
-        spelling_attempt = "".join(words_heard[start_idx:end_idx])
+        interpretation = game.interpret_answer(text_lower, current_word)
+        spelled = interpretation['tokens']
+        spelling_attempt = interpretation['spelling']
         
         # If extraction left us with nothing, but user said something, 
         # it might just be the word itself (repeat request)
         if not spelling_attempt and len(words_heard) > 0:
-            speak_async(f"The word is {current_word}. Please spell {current_word}")
-            return jsonify({'result': 'hint', 'type': 'repeat', 'text': f"Repeating: {current_word}"})
+            speak_async(player, f"The word is {current_word}. Please spell {current_word}")
+            return {'result': 'hint', 'type': 'repeat', 'text': f"Repeating: {current_word}"}
 
         # Validate the extracted spelling
         print(f"Debug - Extracted Spelling: '{spelling_attempt}'")
-        is_correct = game.check_spelling(spelling_attempt, current_word)
+        is_correct = player.check_spelling(spelling_attempt, current_word)
         
         if is_correct:
-            speak_async(f"Correct! The word is {current_word}.")
-            return jsonify({
+            speak_async(player, f"Correct! The word is {current_word}.")
+            return {
                 'result': 'correct', 
-                'heard': " ".join(words_heard[start_idx:end_idx]), # Return spaced for UI
+                'heard': " ".join(spelled), # Return spaced for UI
                 'target': current_word,
-                'score': game.score
-            })
+                'score': player.score
+            }
         else:
-            speak_async(f"Incorrect. The word is {current_word}.")
-            return jsonify({
+            speak_async(player, f"Incorrect. The word is {current_word}.")
+            return {
                 'result': 'incorrect', 
-                'heard': " ".join(words_heard[start_idx:end_idx]), 
+                'heard': " ".join(spelled), 
                 'target': current_word,
-                'score': game.score
-            })
+                'score': player.score,
+                # One or two letters off, and any other word the attempt spells (e.g. a homophone)
+                'near_miss': interpretation['near_miss'],
+                'spells': interpretation.get('spells', [])
+            }
             
     else:
         print("Debug - No voice input detected.")
-        speak_async("I didn't hear anything.")
-        return jsonify({'result': 'no_input', 'target': current_word})
+        speak_async(player, "I didn't hear anything.")
+        return {'result': 'no_input', 'target': current_word}
+
+
+def start_listening(player, retry=0, replace=True):
+    """Submits a listen job for the player's current word and publishes its outcome as events.
+
+    Hints and repeats listen again automatically, and so does silence up to
+    MAX_LISTEN_RETRIES times, so the browser only has to follow the event stream.
+    """
+    current_word = player.current_word
+    # Same dict the context loader is still filling in, so late fields are visible at answer time
+    current_details = player.current_details if player.current_details is not None else {}
+
+    def run(cancel_event):
+        # Wait for any queued speech to finish before listening
+        if not player.wait_for_speech(cancel_event):
+            return {'result': 'cancelled'}
+        player.speech_lock.acquire()
+        held = [True]
+        def release():
+            # The microphone is free once capture ends; recognition runs without holding the lock
+            if held[0]:
+                held[0] = False
+                player.speech_lock.release()
+        try:
+            if cancel_event.is_set():
+                return {'result': 'cancelled'}
+            player.events.publish('listening', {'target_length': len(current_word), 'retry': retry})
+            user_text = game.listen_and_recognize(cancel_event=cancel_event, expected_words=[current_word],
+                                                  on_captured=release)
+        finally:
+            release()
+        if cancel_event.is_set():
+            # Superseded by a newer word or a pause; the client already knows
+            return {'result': 'cancelled'}
+
+        outcome = interpret_transcript(player, current_word, current_details, user_text)
+        if outcome['result'] == 'no_input':
+            outcome.update({'retry': retry, 'max_retries': MAX_LISTEN_RETRIES})
+        player.events.publish('hint' if outcome['result'] == 'hint' else 'result', outcome)
+
+        if outcome['result'] == 'hint':
+            start_listening(player, replace=False)
+        elif outcome['result'] == 'no_input' and retry < MAX_LISTEN_RETRIES:
+            start_listening(player, retry + 1, replace=False)
+        return outcome
+
+    # Follow-up listens are submitted from inside the running job, which must not cancel itself
+    return listen_jobs.submit(run, owner=player.id, replace=replace)
+
+@app.route('/api/listen', methods=['POST'])
+def listen():
+    """Starts a background listen job and returns its id; poll /api/listen/<job_id> or follow /api/events."""
+    player = current_player()
+    if not player.current_word:
+         return jsonify({'error': 'No active word'}), 400
+    job = start_listening(player)
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/listen/<job_id>', methods=['GET'])
+def listen_result(job_id):
+    """Long-polls a listen job for up to `wait` seconds (default LISTEN_WAIT, at most MAX_LISTEN_WAIT)."""
+    job = listen_jobs.get(job_id)
+    if job is None or job.owner != current_player().id:
+        return jsonify({'error': 'Unknown job'}), 404
+    # Unparseable values fall back to the default; NaN would slip through min/max, so it does too
+    wait = request.args.get('wait', LISTEN_WAIT, type=float)
+    if math.isnan(wait):
+        wait = LISTEN_WAIT
+    wait = max(0.0, min(wait, MAX_LISTEN_WAIT))
+    job.wait(wait)
+    return jsonify(job.to_dict())
+
+@app.route('/api/listen/cancel', methods=['POST'])
+def cancel_listen():
+    """Stops any listening in progress for this player (e.g. when the game is paused)."""
+    cancelled = listen_jobs.cancel_owner(current_player().id)
+    return jsonify({'status': 'ok', 'cancelled': cancelled})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,213 @@
+"""Long-lived Bark synthesis worker.
+
+Loads the model once and serves synthesis jobs over a local socket, so
+speak_words.py and the game's TTS pay the model startup once instead of on
+every run. Jobs waiting in the queue with the same voice preset are merged
+into one forward pass.
+
+Usage:
+    python bark_worker.py --threads 8                 # CPU
+    python bark_worker.py --device cuda --dtype float16
+    python bark_worker.py --stats                     # ask a running worker for its counters
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# Configuration
+WORKER_ADDRESS = os.getenv('BARK_WORKER_ADDRESS', 'localhost:6100')
+WORKER_AUTHKEY = os.getenv('BARK_WORKER_AUTHKEY', 'spelling-bee').encode('utf-8')
+MAX_BATCH = 8               # texts per forward pass when merging queued jobs
+LATENCY_WINDOW = 200        # recent jobs kept for latency percentiles
+
+
+def parse_address(address=WORKER_ADDRESS):
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+class BarkWorker:
+    """Owns the loaded model and a single synthesis thread fed by a job queue."""
+
+    def __init__(self, model_state, max_batch=MAX_BATCH):
+        self.processor, self.model, self.device = model_state
+        self.max_batch = max_batch
+        self._jobs = queue.Queue()
+        self._held = deque()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'jobs': 0, 'texts': 0, 'batches': 0, 'errors': 0, 'synth_seconds': 0.0}
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='bark-synth')
+        self._thread.start()
+
+    def submit(self, texts, voice):
+        """Queues texts for synthesis. Returns a Future resolving to a list of float32 arrays."""
+        future = Future()
+        self._jobs.put((list(texts), voice, time.perf_counter(), future))
+        return future
+
+    def _next_batch(self):
+        """Takes the oldest job plus any queued jobs with the same voice, up to max_batch texts."""
+        first = self._held.popleft() if self._held else self._jobs.get()
+        batch, size = [first], len(first[0])
+        while size < self.max_batch:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job[1] != first[1] or size + len(job[0]) > self.max_batch:
+                self._held.append(job)
+                break
+            batch.append(job)
+            size += len(job[0])
+        return batch
+
+    def _run(self):
+        from speak_words import generate_batch
+        while True:
+            batch = self._next_batch()
+            voice = batch[0][1]
+            texts = [text for job in batch for text in job[0]]
+            t0 = time.perf_counter()
+            try:
+                clips = generate_batch(texts, self.processor, self.model, self.device, voice)
+            except Exception as e:
+                print(f"Bark synthesis error: {e}")
+                with self._lock:
+                    self.stats['errors'] += len(batch)
+                for job in batch:
+                    job[3].set_exception(e)
+                continue
+            done = time.perf_counter()
+            offset = 0
+            with self._lock:
+                self.stats['batches'] += 1
+                self.stats['synth_seconds'] += done - t0
+                for texts_in_job, _, submitted, _ in batch:
+                    self.stats['jobs'] += 1
+                    self.stats['texts'] += len(texts_in_job)
+                    self._latencies.append(done - submitted)
+            for texts_in_job, _, _, future in batch:
+                future.set_result(clips[offset:offset + len(texts_in_job)])
+                offset += len(texts_in_job)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            latencies = np.array(self._latencies)
+        stats.update({
+            'queue_depth': self._jobs.qsize() + len(self._held),
+            'device': str(self.device),
+            'uptime_seconds': time.time() - self.started_at,
+            'words_per_second': stats['texts'] / stats['synth_seconds'] if stats['synth_seconds'] else 0.0,
+            'latency_p50': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            'latency_p90': float(np.percentile(latencies, 90)) if len(latencies) else 0.0,
+        })
+        return stats
+
+
+def _serve_connection(worker, conn):
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            op = request.get('op')
+            if op == 'synthesize':
+                try:
+                    clips = worker.submit(request['texts'], request['voice']).result()
+                    conn.send({'ok': True, 'audio': clips})
+                except Exception as e:
+                    conn.send({'ok': False, 'error': str(e)})
+            elif op == 'stats':
+                conn.send({'ok': True, 'stats': worker.snapshot()})
+            else:
+                conn.send({'ok': False, 'error': f"Unknown op '{op}'"})
+    finally:
+        conn.close()
+
+
+def serve(worker, address=WORKER_ADDRESS, authkey=WORKER_AUTHKEY):
+    with Listener(parse_address(address), authkey=authkey) as listener:
+        print(f"Bark worker listening on {address}.")
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_serve_connection, args=(worker, conn), daemon=True).start()
+
+
+class BarkClient:
+    """Connection to a running bark_worker. Safe to share between threads."""
+
+    def __init__(self, address=WORKER_ADDRESS, authkey=WORKER_AUTHKEY):
+        self.address = address
+        self.authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _call(self, request):
+        with self._lock:
+            if self._conn is None:
+                self._conn = Client(parse_address(self.address), authkey=self.authkey)
+            try:
+                self._conn.send(request)
+                response = self._conn.recv()
+            except (EOFError, OSError):
+                # Worker restarted: drop the connection so the next call reconnects
+                self._conn.close()
+                self._conn = None
+                raise
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'Bark worker error'))
+        return response
+
+    def synthesize(self, texts, voice):
+        """Returns one float32 array (24 kHz) per text."""
+        return self._call({'op': 'synthesize', 'texts': list(texts), 'voice': voice})['audio']
+
+    def stats(self):
+        return self._call({'op': 'stats'})['stats']
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Bark synthesis from a model loaded once.")
+    parser.add_argument('--address', default=WORKER_ADDRESS, help="host:port to listen on")
+    parser.add_argument('--device', help="cpu or cuda (default: cuda if available)")
+    parser.add_argument('--dtype', choices=['float32', 'float16', 'bfloat16'], default='float32',
+                        help="Weight precision (float16 needs a GPU; bfloat16 helps on recent CPUs)")
+    parser.add_argument('--threads', type=int, help="torch CPU threads")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--stats', action='store_true', help="Print a running worker's stats and exit")
+    args = parser.parse_args()
+
+    if args.stats:
+        client = BarkClient(args.address)
+        for key, value in client.stats().items():
+            print(f"  {key}: {value}")
+        client.close()
+        return
+
+    from speak_words import setup_model
+    worker = BarkWorker(setup_model(device=args.device, threads=args.threads, dtype=args.dtype), args.max_batch)
+    try:
+        serve(worker, args.address)
+    except KeyboardInterrupt:
+        print("\nStopping Bark worker.")
+
+
+if __name__ == "__main__":
+    main()
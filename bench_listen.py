@@ -0,0 +1,63 @@
+"""Benchmarks the listen -> recognize -> check path without a microphone or network.
+
+Uses the replay STT backend: each fixture is `name.wav` + `name.json` with
+{"word": "apple", "transcript": "apple a p p l e apple", "correct": true}.
+
+Usage:
+    python bench_listen.py fixtures/audio --rounds 3 --speed 0
+"""
+import argparse
+import time
+
+import numpy as np
+
+from recognizers import ReplayRecognizer
+from spelling_bee import SpellingBeeGame, spelling_matches
+
+
+def summarize(label, values):
+    values = np.array(values) * 1000
+    print(f"  {label:<10} mean {values.mean():8.1f} ms   p50 {np.percentile(values, 50):8.1f} ms   "
+          f"p90 {np.percentile(values, 90):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the spelling listen pipeline on WAV fixtures.")
+    parser.add_argument('fixtures', help="Folder with .wav/.json fixture pairs")
+    parser.add_argument('--rounds', type=int, default=1, help="Passes over the fixture set")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Replay speed (1.0 = real time, 0 = as fast as possible)")
+    args = parser.parse_args()
+
+    recognizer = ReplayRecognizer(args.fixtures, speed=args.speed)
+    game = SpellingBeeGame(recognizer=recognizer)
+
+    listen_times, check_times = [], []
+    graded = agreed = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for fixture in recognizer.fixtures:
+            word = fixture.get('word', '')
+            t0 = time.perf_counter()
+            text = game.listen_and_recognize(expected_words=[word])
+            t1 = time.perf_counter()
+            is_correct = spelling_matches(game.interpret_answer(text or '', word)['spelling'], word)
+            t2 = time.perf_counter()
+            listen_times.append(t1 - t0)
+            check_times.append(t2 - t1)
+            if 'correct' in fixture:
+                graded += 1
+                agreed += (is_correct == fixture['correct'])
+    elapsed = time.perf_counter() - start
+
+    turns = len(listen_times)
+    print(f"\n{turns} turns in {elapsed:.2f}s ({turns / elapsed:.1f} turns/s), replay speed {args.speed or 'max'}")
+    summarize("listen", listen_times)
+    summarize("check", check_times)
+    if graded:
+        print(f"  grading agrees with fixture labels on {agreed}/{graded} turns")
+    game.prefetcher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmarks the persistent TF-IDF index against refitting per query (the original test.py approach).
+
+Builds a synthetic corpus with Zipf-distributed terms, then reports fit,
+save and load times, query latency, incremental add cost, and checks the
+argpartition top-K against a full sort.
+
+Usage:
+    python bench_similarity.py --docs 100000 --queries 200
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from similarity_index import SimilarityIndex
+
+
+def summarize(label, values):
+    values = np.array(values) * 1000
+    print(f"  {label:<10} mean {values.mean():8.2f} ms   p50 {np.percentile(values, 50):8.2f} ms   "
+          f"p90 {np.percentile(values, 90):8.2f} ms")
+
+
+def synthetic_corpus(count, terms, rng, min_len=8, max_len=30):
+    """Documents of Zipf-distributed terms (a few very common, a long tail of rare ones)."""
+    vocabulary = np.array([f"term{i}" for i in range(terms)])
+    lengths = rng.integers(min_len, max_len + 1, size=count)
+    picks = np.minimum(rng.zipf(1.3, size=int(lengths.sum())), terms) - 1
+    words = vocabulary[picks]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [" ".join(words[bounds[i]:bounds[i + 1]]) for i in range(count)]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TF-IDF similarity index on a synthetic corpus.")
+    parser.add_argument('--docs', type=int, default=100000, help="Documents in the corpus")
+    parser.add_argument('--terms', type=int, default=50000, help="Distinct terms in the synthetic vocabulary")
+    parser.add_argument('--queries', type=int, default=200, help="Queries timed against the index")
+    parser.add_argument('--k', type=int, default=10, help="Results per query")
+    parser.add_argument('--add', type=int, default=1000, help="Documents added incrementally")
+    parser.add_argument('--baseline', type=int, default=3, help="Queries timed with a full refit (slow)")
+    parser.add_argument('--dir', help="Where to save the index (default: a temporary folder)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    corpus, elapsed = timed(synthetic_corpus, args.docs, args.terms, rng)
+    queries = synthetic_corpus(args.queries, args.terms, rng, 3, 8)
+    print(f"Corpus: {args.docs} documents generated in {elapsed:.1f}s")
+
+    index, fit_seconds = timed(SimilarityIndex.fit, corpus)
+    nnz = sum(segment.nnz for segment in index.segments)
+    print(f"Fit: {fit_seconds:.2f}s, {index.vocabulary_size} terms, {nnz} non-zeros")
+
+    path = args.dir or tempfile.mkdtemp(prefix='similarity_index_')
+    try:
+        _, save_seconds = timed(index.save, path)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        loaded, load_seconds = timed(SimilarityIndex.load, path)
+        print(f"Save: {save_seconds:.2f}s ({size / 1e6:.1f} MB)   load (mmap): {load_seconds * 1000:.0f} ms")
+
+        latencies = [timed(loaded.query, text, args.k)[1] for text in queries]
+        print(f"\nIndex queries (k={args.k}, {len(queries)} queries):")
+        summarize("query", latencies)
+
+        # The original approach: refit on corpus + query, then a dense similarity row
+        baseline = []
+        for text in queries[:args.baseline]:
+            start = time.perf_counter()
+            matrix = TfidfVectorizer().fit_transform(corpus + [text])
+            cosine_similarity(matrix[-1], matrix[:-1])[0]
+            baseline.append(time.perf_counter() - start)
+        if baseline:
+            print(f"Refit per query ({len(baseline)} queries):")
+            summarize("refit", baseline)
+            print(f"  speed-up {np.mean(baseline) / np.mean(latencies):.0f}x")
+
+        # argpartition top-K must agree with a full sort
+        agree = 0
+        for text in queries[:50]:
+            scores = loaded.scores(text)
+            expected = set(np.argsort(-scores, kind='stable')[:args.k])
+            got = {i for i, _ in loaded.query(text, args.k)}
+            cutoff = np.sort(scores)[-args.k] if len(scores) >= args.k else 0
+            # Ties at the cut-off may legitimately pick different documents
+            agree += got == expected or all(scores[i] >= cutoff for i in got)
+        print(f"  top-K agrees with a full sort on {agree}/{min(50, len(queries))} queries")
+
+        extra = synthetic_corpus(args.add, args.terms, rng)
+        _, add_seconds = timed(loaded.add, extra)
+        _, incremental_seconds = timed(loaded.save)
+        print(f"\nIncremental add of {args.add} documents: {add_seconds * 1000:.0f} ms, "
+              f"save {incremental_seconds * 1000:.0f} ms ({len(loaded.segments)} segments)")
+        latencies = [timed(loaded.query, text, args.k)[1] for text in queries]
+        summarize("query", latencies)
+        _, compact_seconds = timed(loaded.compact)
+        reopened = SimilarityIndex.load(path)
+        print(f"Compact: {compact_seconds:.2f}s, reopened with {len(reopened)} documents "
+              f"in {len(reopened.segments)} segment(s)")
+    finally:
+        if not args.dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmarks spelling interpretation on labelled transcripts and near-miss lookup over the word bank.
+
+Each fixture is {"word": "bee", "transcript": "bee b e e bee", "correct": true}.
+Grading accuracy is compared with the previous extraction (strip the
+target at the ends, join the rest), and near-miss lookups through the
+deletion index are timed against a linear scan of the word bank.
+
+Usage:
+    python bench_spelling.py --fixtures fixtures/spelling_transcripts.json --rounds 20
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from spelling_interpreter import SpellingIndex, bounded_distance, interpret, INDEX_DISTANCE
+from word_sync import clean_word, spelling_key
+
+
+def summarize(label, values):
+    values = np.array(values) * 1e6
+    print(f"  {label:<12} mean {values.mean():8.1f} us   p50 {np.percentile(values, 50):8.1f} us   "
+          f"p90 {np.percentile(values, 90):8.1f} us")
+
+
+def baseline_spelling(transcript, word):
+    """The original extraction: drop the target only when it is exactly the first/last token."""
+    target = word.lower().strip()
+    heard = transcript.lower().split()
+    start, end = 0, len(heard)
+    if heard and heard[0] == target:
+        start = 1
+    if len(heard) > 1 and heard[-1] == target:
+        end = len(heard) - 1
+    return "".join(heard[start:end])
+
+
+def load_words(excel_path):
+    frame = pd.read_excel(excel_path)
+    column = next(c for c in frame.columns if str(c).strip().lower() == 'word')
+    return sorted({clean_word(w) for w in frame[column].dropna() if clean_word(w)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spelling interpretation and near-miss lookup.")
+    parser.add_argument('--fixtures', default='fixtures/spelling_transcripts.json', help="Labelled transcripts")
+    parser.add_argument('--excel', default='word_list.xlsx', help="Word bank used for the near-miss index")
+    parser.add_argument('--rounds', type=int, default=20, help="Passes over the fixtures when timing")
+    args = parser.parse_args()
+
+    with open(args.fixtures, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    words = load_words(args.excel)
+
+    start = time.perf_counter()
+    index = SpellingIndex(words)
+    build_seconds = time.perf_counter() - start
+    print(f"Index: {len(index)} spellings from {len(words)} words built in {build_seconds * 1000:.0f} ms "
+          f"(deletion depth {INDEX_DISTANCE})")
+
+    # Grading accuracy against the labels
+    old_right = new_right = 0
+    for fixture in fixtures:
+        target = spelling_key(fixture['word'])
+        old_right += (baseline_spelling(fixture['transcript'], fixture['word']) == target) == fixture['correct']
+        result = interpret(fixture['transcript'], fixture['word'], index)
+        agrees = (result['spelling'] == target) == fixture['correct']
+        new_right += agrees
+        if not agrees:
+            print(f"  disagrees: {fixture['word']!r} <- {fixture['transcript']!r} read as {result['spelling']!r}")
+    print(f"\nGrading agrees with labels: previous extraction {old_right}/{len(fixtures)}, "
+          f"interpreter {new_right}/{len(fixtures)}")
+
+    # Per-transcript latency
+    baseline, interpreted = [], []
+    for _ in range(args.rounds):
+        for fixture in fixtures:
+            t0 = time.perf_counter()
+            baseline_spelling(fixture['transcript'], fixture['word'])
+            t1 = time.perf_counter()
+            interpret(fixture['transcript'], fixture['word'], index)
+            t2 = time.perf_counter()
+            baseline.append(t1 - t0)
+            interpreted.append(t2 - t1)
+    print(f"\nPer transcript ({len(interpreted)} interpretations):")
+    summarize("previous", baseline)
+    summarize("interpreter", interpreted)
+
+    # Near-miss lookup: deletion index vs scanning every spelling
+    keys = list(index.words)
+    rng = np.random.default_rng(0)
+    probes = []
+    for key in rng.choice(keys, size=min(500, len(keys)), replace=False):
+        key = str(key)
+        i = int(rng.integers(len(key))) if key else 0
+        probes.append(key[:i] + key[i + 1:] if rng.random() < 0.5 else key[:i] + 'x' + key[i + 1:])
+    indexed, scanned = [], []
+    mismatches = 0
+    for probe in probes:
+        t0 = time.perf_counter()
+        found = {word for word, _ in index.near(probe)}
+        t1 = time.perf_counter()
+        expected = {word for key in keys if bounded_distance(probe, key, INDEX_DISTANCE) <= INDEX_DISTANCE
+                    for word in index.words[key]}
+        t2 = time.perf_counter()
+        indexed.append(t1 - t0)
+        scanned.append(t2 - t1)
+        mismatches += found != expected
+    print(f"\nNear-miss lookup ({len(probes)} one-edit probes over {len(keys)} spellings):")
+    summarize("index", indexed)
+    summarize("scan", scanned)
+    print(f"  speed-up {np.mean(scanned) / np.mean(indexed):.0f}x, results differ on {mismatches} probes")
+
+
+if __name__ == "__main__":
+    main()
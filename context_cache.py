@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Configuration
+CONTEXT_TABLE = 'word_context'
+MEMORY_SIZE = 512                  # entries kept in the in-process LRU
+MAX_ROWS = 20000                   # rows kept in SQLite before eviction
+TTL_SECONDS = 30 * 24 * 3600       # successful lookups live for 30 days
+NEGATIVE_TTL_SECONDS = 300         # failed lookups are retried after 5 minutes
+
+
+def normalize_word(word):
+    """Canonical cache key for a word: markup removed, whitespace collapsed, lowercased."""
+    return " ".join(str(word).replace('**', '').split()).lower()
+
+
+class ContextCache:
+    """Two-level (memory LRU + SQLite) cache for LLM word context.
+
+    Entries are keyed by normalized word and a version string that should
+    change whenever the prompt or model changes. Failures are cached for a
+    short time so a broken word does not trigger an API call on every request.
+    """
+
+    def __init__(self, db_file, version, memory_size=MEMORY_SIZE, max_rows=MAX_ROWS,
+                 ttl=TTL_SECONDS, negative_ttl=NEGATIVE_TTL_SECONDS):
+        self.db_file = db_file
+        self.version = version
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'negative_hits': 0, 'misses': 0}
+        self._ensure_table()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def _ensure_table(self):
+        try:
+            conn = self._connect()
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CONTEXT_TABLE} (
+                    word TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    details TEXT,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (word, version)
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{CONTEXT_TABLE}_accessed ON {CONTEXT_TABLE} (accessed_at)")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Context cache error: {e}")
+
+    def _remember(self, key, details, expires_at):
+        with self._lock:
+            self._memory[key] = (details, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def lookup(self, word):
+        """Returns (status, details) where status is 'hit', 'negative' or 'miss'."""
+        key = normalize_word(word)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                details, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    if details is None:
+                        self.stats['negative_hits'] += 1
+                        return 'negative', None
+                    self.stats['memory_hits'] += 1
+                    return 'hit', dict(details)
+                del self._memory[key]
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT details, expires_at FROM {CONTEXT_TABLE} WHERE word = ? AND version = ?",
+                (key, self.version)
+            ).fetchone()
+            if row and row[1] > now:
+                conn.execute(
+                    f"UPDATE {CONTEXT_TABLE} SET accessed_at = ? WHERE word = ? AND version = ?",
+                    (now, key, self.version)
+                )
+                conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Context cache error: {e}")
+            row = None
+
+        if row and row[1] > now:
+            details = json.loads(row[0]) if row[0] else None
+            self._remember(key, details, row[1])
+            with self._lock:
+                if details is None:
+                    self.stats['negative_hits'] += 1
+                    return 'negative', None
+                self.stats['db_hits'] += 1
+            return 'hit', dict(details)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return 'miss', None
+
+    def get(self, word):
+        """Returns cached details for a word, or None on a miss or cached failure."""
+        status, details = self.lookup(word)
+        return details if status == 'hit' else None
+
+    def put(self, word, details):
+        self._store([(word, details, self.ttl)])
+
+    def put_failure(self, word):
+        """Records a failed lookup so it is not retried until the negative TTL expires."""
+        self._store([(word, None, self.negative_ttl)])
+
+    def put_many(self, results):
+        """Stores a {word: details} mapping in one transaction; None details are cached as failures."""
+        self._store([(word, details, self.ttl if details else self.negative_ttl)
+                     for word, details in results.items()])
+
+    def _store(self, entries):
+        now = time.time()
+        rows = []
+        for word, details, ttl in entries:
+            key = normalize_word(word)
+            expires_at = now + ttl
+            self._remember(key, dict(details) if details else None, expires_at)
+            rows.append((key, self.version, json.dumps(details) if details else None, expires_at, now))
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {CONTEXT_TABLE} (word, version, details, expires_at, accessed_at) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict(conn, now)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Context cache error: {e}")
+
+    def _evict(self, conn, now):
+        """Drops expired rows, then the least recently used rows above max_rows."""
+        conn.execute(f"DELETE FROM {CONTEXT_TABLE} WHERE expires_at <= ?", (now,))
+        count = conn.execute(f"SELECT COUNT(*) FROM {CONTEXT_TABLE}").fetchone()[0]
+        if count > self.max_rows:
+            conn.execute(
+                f"DELETE FROM {CONTEXT_TABLE} WHERE rowid IN "
+                f"(SELECT rowid FROM {CONTEXT_TABLE} ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_rows,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        try:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {CONTEXT_TABLE} WHERE version = ?", (self.version,))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Context cache error: {e}")
@@ -0,0 +1,102 @@
+"""Offline end-pointing evaluation for the voice-activity detectors in vad.py.
+
+Streams each WAV in a folder through a detector in microphone-sized blocks
+and compares the moment it stops listening with the labelled end of speech.
+
+Labels are a JSON file mapping WAV file names to the end of speech in
+seconds, e.g. {"apple_slow.wav": {"speech_end": 3.42}}.
+
+Usage:
+    python evaluate_vad.py recordings/ --labels recordings/labels.json --end-ms 800 1200 1500 --baseline
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import scipy.io.wavfile as wav
+
+from vad import VoiceActivityDetector, FixedThresholdDetector
+
+BLOCK_SIZE = 1024       # samples per callback block, as sounddevice delivers them
+MAX_DURATION = 10.0     # seconds; matches spelling_bee.DURATION
+
+
+def load_mono_int16(path):
+    rate, data = wav.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if data.dtype.kind == 'f':
+        data = data * 32767
+    elif data.dtype == np.int32:
+        data = data / 65536
+    elif data.dtype == np.uint8:
+        data = (data.astype(np.int16) - 128) * 256
+    return rate, np.clip(data, -32768, 32767).astype(np.int16)
+
+
+def run_detector(detector, samples, rate, max_duration=MAX_DURATION):
+    """Returns the time (s) at which the detector stopped listening, or max_duration on timeout."""
+    limit = min(len(samples), int(rate * max_duration))
+    for start in range(0, limit, BLOCK_SIZE):
+        if detector.process(samples[start:start + BLOCK_SIZE]):
+            return (start + BLOCK_SIZE) / rate, False
+    return max_duration, True
+
+
+def evaluate(name, factory, clips):
+    latencies = []
+    truncated = 0
+    timeouts = 0
+    for file_name, rate, samples, speech_end in clips:
+        stop, timed_out = run_detector(factory(rate), samples, rate)
+        timeouts += timed_out
+        if stop < speech_end:
+            truncated += 1
+        else:
+            latencies.append(stop - speech_end)
+
+    print(f"\n{name}")
+    print(f"  clips: {len(clips)}  truncated: {truncated} ({truncated / len(clips):.0%})  timeouts: {timeouts}")
+    if latencies:
+        lat = np.array(latencies)
+        print(f"  end-pointing latency: mean {lat.mean():.2f}s  p50 {np.percentile(lat, 50):.2f}s  "
+              f"p90 {np.percentile(lat, 90):.2f}s  max {lat.max():.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate VAD end-pointing on recorded WAVs.")
+    parser.add_argument('folder', help="Folder of .wav recordings")
+    parser.add_argument('--labels', help="JSON file of speech_end labels (default: <folder>/labels.json)")
+    parser.add_argument('--end-ms', type=int, nargs='+', default=[1500],
+                        help="End-of-speech hangover values to compare")
+    parser.add_argument('--baseline', action='store_true', help="Also run the original fixed-threshold detector")
+    args = parser.parse_args()
+
+    labels_path = args.labels or os.path.join(args.folder, 'labels.json')
+    with open(labels_path) as f:
+        labels = json.load(f)
+
+    clips = []
+    for file_name in sorted(os.listdir(args.folder)):
+        if not file_name.lower().endswith('.wav'):
+            continue
+        if file_name not in labels:
+            print(f"Skipping {file_name}: no label.")
+            continue
+        rate, samples = load_mono_int16(os.path.join(args.folder, file_name))
+        clips.append((file_name, rate, samples, float(labels[file_name]['speech_end'])))
+
+    if not clips:
+        print("No labelled recordings found.")
+        return
+
+    if args.baseline:
+        evaluate("fixed threshold (80, 2.0s)", FixedThresholdDetector, clips)
+    for end_ms in args.end_ms:
+        evaluate(f"adaptive VAD (end {end_ms} ms)",
+                 lambda rate: VoiceActivityDetector(rate, end_of_speech_ms=end_ms), clips)
+
+
+if __name__ == "__main__":
+    main()
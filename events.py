@@ -0,0 +1,76 @@
+import json
+import queue
+import threading
+
+# Configuration
+HEARTBEAT_SECONDS = 15      # comment line sent when idle so proxies keep the stream open
+SUBSCRIBER_BUFFER = 100     # events buffered per subscriber before the oldest are dropped
+
+
+class EventChannel:
+    """Fan-out of server-side game events to Server-Sent Events subscribers.
+
+    Each subscriber gets its own bounded queue; publish() never blocks the
+    game pipeline, and a slow client just loses its oldest events.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._closed = False
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        with self._lock:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def publish(self, event, data=None):
+        with self._lock:
+            self._seq += 1
+            message = (self._seq, event, data or {})
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def close(self):
+        """Ends every open stream (e.g. when the session is evicted)."""
+        with self._lock:
+            self._closed = True
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        """Generator of SSE-formatted messages for one subscriber."""
+        q = self.subscribe()
+        try:
+            yield "retry: 2000\n\n"
+            while not self._closed:
+                try:
+                    message = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                seq, event, data = message
+                yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(q)
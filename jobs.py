@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+LISTEN_WORKERS = 4          # concurrent listen/recognize jobs
+JOB_TTL = 10 * 60           # seconds a finished job stays pollable
+
+
+class Job:
+    def __init__(self, owner=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Set to ask a running job to stop early; the job function decides how
+        self.cancel_event = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'status': self.status}
+        if self.result is not None:
+            data['result'] = self.result
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+
+class JobManager:
+    """Runs blocking work (microphone capture + recognition) on a bounded pool.
+
+    HTTP handlers submit a job and return its id immediately; clients then
+    long-poll for the result. Each job receives its cancel Event so a pause
+    can stop a capture that is still waiting for speech.
+    """
+
+    def __init__(self, max_workers=LISTEN_WORKERS, job_ttl=JOB_TTL):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='listen')
+        self.max_workers = max_workers
+        self.job_ttl = job_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.stats = {'submitted': 0, 'completed': 0, 'cancelled': 0, 'failed': 0,
+                      'total_wait_seconds': 0.0, 'total_run_seconds': 0.0}
+
+    def submit(self, fn, owner=None, replace=True):
+        """Queues fn(cancel_event) and returns its Job.
+
+        With `replace`, earlier unfinished jobs of the same owner are cancelled.
+        """
+        job = Job(owner)
+        with self._lock:
+            self._purge()
+            if owner is not None and replace:
+                for other in self._jobs.values():
+                    if other.owner == owner and not other.finished:
+                        other.cancel_event.set()
+            self._jobs[job.id] = job
+            self.stats['submitted'] += 1
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        job.started_at = time.time()
+        try:
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+                return
+            job.status = 'running'
+            job.result = fn(job.cancel_event)
+            job.status = 'cancelled' if job.cancel_event.is_set() else 'done'
+        except Exception as e:
+            print(f"Job error: {e}")
+            job.error = str(e)
+            job.status = 'error'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                key = {'done': 'completed', 'cancelled': 'cancelled', 'error': 'failed'}[job.status]
+                self.stats[key] += 1
+                self.stats['total_wait_seconds'] += job.started_at - job.created_at
+                self.stats['total_run_seconds'] += job.finished_at - job.started_at
+            job._done.set()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+        return job
+
+    def cancel_owner(self, owner):
+        """Cancels every unfinished job of an owner. Returns how many were signalled."""
+        count = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if job.owner == owner and not job.finished:
+                    job.cancel_event.set()
+                    count += 1
+        return count
+
+    def _purge(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def snapshot(self):
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values() if j.status == 'queued')
+            running = sum(1 for j in self._jobs.values() if j.status == 'running')
+            stats = dict(self.stats)
+        finished = stats['completed'] + stats['cancelled'] + stats['failed']
+        stats.update({
+            'queue_depth': queued,
+            'running': running,
+            'workers': self.max_workers,
+            'avg_wait_seconds': stats['total_wait_seconds'] / finished if finished else 0.0,
+            'avg_run_seconds': stats['total_run_seconds'] / finished if finished else 0.0,
+        })
+        return stats
@@ -0,0 +1,424 @@
+"""Shared access layer for OpenAI-compatible chat completion APIs (Groq by default).
+
+One asyncio event loop runs in a background thread and owns a pooled
+httpx.AsyncClient. Every call gets an overall deadline, bounded retries with
+jittered exponential backoff, and a slot from a semaphore that caps
+concurrent requests. A 429 response pauses new requests until its
+Retry-After has passed, so a rate-limited burst waits in line instead of
+hammering the API.
+
+Flask handlers use the blocking LLMClient facade (chat/submit/stream); async
+code can use AsyncLLMClient directly. Streamed completions hand each text
+delta to a callback as it arrives.
+
+Offline load testing:
+    python llm_client.py --stub --port 8799 --latency 0.3 --rate-limit 0.1
+    LLM_BASE_URL=http://localhost:8799 python llm_client.py --load-test 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+DEFAULT_BASE_URL = 'https://api.groq.com/openai/v1'
+LLM_BASE_URL = os.getenv('LLM_BASE_URL', DEFAULT_BASE_URL)
+LLM_API_KEY = os.getenv('GROQ_API_KEY')
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))        # default per-call deadline, seconds
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+BACKOFF_BASE = 0.5          # first retry waits up to this long
+BACKOFF_MAX = 8.0           # cap for a single backoff
+CONNECT_TIMEOUT = 5.0
+RESULT_GRACE = 5.0          # blocking callers give up this long after the call's own deadline
+LATENCY_WINDOW = 200        # recent calls kept for latency percentiles
+
+
+class LLMError(Exception):
+    """A completion could not be obtained."""
+
+
+class LLMTimeout(LLMError):
+    """The call's deadline passed before a completion arrived."""
+
+
+def is_configured():
+    """True when there is something to talk to: an API key, or a custom (e.g. stub) base URL."""
+    return bool(LLM_API_KEY) or LLM_BASE_URL != DEFAULT_BASE_URL
+
+
+class AsyncLLMClient:
+    """Pooled, rate-limit aware chat completion client. Create and use it on one event loop."""
+
+    def __init__(self, base_url=LLM_BASE_URL, api_key=LLM_API_KEY, max_concurrency=LLM_MAX_CONCURRENCY,
+                 timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES):
+        headers = {'Authorization': f"Bearer {api_key}"} if api_key else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cooldown_until = 0.0
+        self._in_flight = 0
+        self._waiting = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'calls': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0, 'timeouts': 0}
+
+    async def chat(self, messages, model, deadline=None, **params):
+        """Returns the completion text for `messages`, or raises LLMError.
+
+        `deadline` (seconds) bounds the whole call, including queueing and retries.
+        Extra params (response_format, temperature, ...) go into the request body.
+        """
+        return await self._call({'model': model, 'messages': messages, **params}, deadline)
+
+    async def stream_chat(self, messages, model, on_delta, deadline=None, **params):
+        """Streams a completion, calling on_delta(text) for each piece. Returns the full text.
+
+        Failures before the first piece are retried like chat(); once text has
+        been delivered an error is raised instead, so no piece is repeated.
+        """
+        payload = {'model': model, 'messages': messages, 'stream': True, **params}
+        return await self._call(payload, deadline, on_delta)
+
+    async def _call(self, payload, deadline, on_delta=None):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.stats['calls'] += 1
+        try:
+            content = await self._request(payload, started + (deadline or self.timeout), on_delta)
+        except LLMError:
+            self.stats['failed'] += 1
+            raise
+        self.stats['succeeded'] += 1
+        self._latencies.append(loop.time() - started)
+        return content
+
+    async def _request(self, payload, end, on_delta):
+        loop = asyncio.get_running_loop()
+        delivered = []
+        for attempt in range(self.max_retries + 1):
+            # Rate-limit aware queueing: nobody starts a request during a 429 cooldown
+            wait = self._cooldown_until - loop.time()
+            if wait > 0:
+                if loop.time() + wait >= end:
+                    self.stats['timeouts'] += 1
+                    raise LLMTimeout("Deadline would pass while rate limited")
+                await asyncio.sleep(wait)
+
+            retry_after = None
+            sent = False
+            self._waiting += 1
+            try:
+                # Queue for a slot only until the deadline, not indefinitely behind slower calls
+                await asyncio.wait_for(self._semaphore.acquire(), max(0.0, end - loop.time()))
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                raise LLMTimeout("Deadline passed while queued") from None
+            finally:
+                self._waiting -= 1
+            try:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise LLMTimeout("Deadline passed while queued")
+                self._in_flight += 1
+                sent = True
+                timeout = httpx.Timeout(remaining, connect=min(CONNECT_TIMEOUT, remaining))
+                if on_delta is None:
+                    response = await self._http.post('/chat/completions', json=payload, timeout=timeout)
+                    error, retry_after = self._check_status(response)
+                    if error is None:
+                        return _completion_text(response)
+                else:
+                    async with self._http.stream('POST', '/chat/completions', json=payload,
+                                                 timeout=timeout) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                        error, retry_after = self._check_status(response)
+                        if error is None:
+                            return await self._read_stream(response, end, on_delta, delivered)
+            except httpx.TimeoutException:
+                self.stats['timeouts'] += 1
+                error = LLMTimeout("Request timed out")
+            except httpx.TransportError as e:
+                error = LLMError(f"Connection error: {e}")
+            finally:
+                if sent:
+                    self._in_flight -= 1
+                self._semaphore.release()
+
+            if attempt == self.max_retries or delivered:
+                raise error
+            # Full jitter: spread simultaneous retries out instead of synchronizing them
+            delay = retry_after or random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            if loop.time() + delay >= end:
+                if isinstance(error, LLMTimeout):
+                    raise error
+                self.stats['timeouts'] += 1
+                raise LLMTimeout(f"Deadline would pass before retrying ({error})")
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    def _check_status(self, response):
+        """Returns (None, None) for a 200, (error, retry_after) for retryable failures; raises otherwise."""
+        if response.status_code == 200:
+            return None, None
+        if response.status_code == 429:
+            self.stats['rate_limited'] += 1
+            retry_after = _retry_after(response)
+            if retry_after:
+                loop = asyncio.get_running_loop()
+                self._cooldown_until = max(self._cooldown_until, loop.time() + retry_after)
+            return LLMError("Rate limited (429)"), retry_after
+        if response.status_code >= 500:
+            return LLMError(f"Server error {response.status_code}"), None
+        raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+    @staticmethod
+    async def _read_stream(response, end, on_delta, delivered):
+        """Reads server-sent completion chunks, passing each text delta to on_delta."""
+        loop = asyncio.get_running_loop()
+        async for line in response.aiter_lines():
+            if loop.time() > end:
+                raise LLMTimeout("Deadline passed while streaming")
+            if not line.startswith('data:'):
+                continue
+            data = line[5:].strip()
+            if data == '[DONE]':
+                break
+            try:
+                delta = json.loads(data)['choices'][0]['delta'].get('content')
+            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                raise LLMError(f"Malformed stream chunk: {e}")
+            if delta:
+                delivered.append(delta)
+                on_delta(delta)
+        return ''.join(delivered)
+
+    def snapshot(self):
+        stats = dict(self.stats)
+        latencies = sorted(self._latencies)
+        stats.update({
+            'in_flight': self._in_flight,
+            'queued': self._waiting,
+            'max_concurrency': self.max_concurrency,
+            'latency_p50': latencies[len(latencies) // 2] if latencies else 0.0,
+            'latency_p90': latencies[int(len(latencies) * 0.9)] if latencies else 0.0,
+        })
+        return stats
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def _completion_text(response):
+    try:
+        return response.json()['choices'][0]['message']['content']
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise LLMError(f"Malformed completion response: {e}")
+
+
+def _retry_after(response):
+    try:
+        return max(0.0, float(response.headers.get('retry-after', '')))
+    except ValueError:
+        return None
+
+
+class LLMClient:
+    """Blocking facade over AsyncLLMClient for threaded code such as Flask handlers.
+
+    The async client lives on a private event loop thread, so every caller in
+    the process shares one connection pool and one concurrency budget.
+    """
+
+    def __init__(self, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name='llm-loop')
+        self._thread.start()
+        self._client = self._run(self._create(kwargs)).result()
+
+    @staticmethod
+    async def _create(kwargs):
+        return AsyncLLMClient(**kwargs)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def submit(self, messages, model, deadline=None, **params):
+        """Starts a completion and returns a concurrent.futures.Future for its text."""
+        return self._run(self._client.chat(messages, model, deadline=deadline, **params))
+
+    def chat(self, messages, model, deadline=None, **params):
+        """Returns the completion text, blocking the calling thread; raises LLMError."""
+        return self._result(self.submit(messages, model, deadline=deadline, **params), deadline)
+
+    def stream(self, messages, model, on_delta, deadline=None, **params):
+        """Streams a completion, blocking until it ends; returns the full text.
+
+        on_delta runs on the client's event loop thread, so it should be quick.
+        """
+        coroutine = self._client.stream_chat(messages, model, on_delta, deadline=deadline, **params)
+        return self._result(self._run(coroutine), deadline)
+
+    def _result(self, future, deadline):
+        # The loop enforces the deadline itself; the margin only guards against a stalled loop thread
+        try:
+            return future.result(timeout=(deadline or self._client.timeout) + RESULT_GRACE)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise LLMTimeout("No result from the client loop") from None
+
+    def snapshot(self):
+        return self._run(self._snapshot()).result()
+
+    async def _snapshot(self):
+        return self._client.snapshot()
+
+    def close(self):
+        self._run(self._client.aclose()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Returns the process-wide LLMClient, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
+
+
+# --- Offline stub server -------------------------------------------------------
+
+def stub_completion(prompt):
+    """Canned JSON answers shaped like the ones the apps ask for."""
+    match = re.search(r"Words: (\[.*\])", prompt)
+    if match:
+        words = json.loads(match.group(1))
+        return json.dumps({w: {"meaning": f"Stub meaning of ***.", "origin": "Stub origin.",
+                               "sentence": "A stub sentence with ***."} for w in words})
+    if "resume:" in prompt:
+        return json.dumps({"JD Match": "50%", "MissingKeywords": ["stub"], "Profile Summary": "Stub summary.",
+                           "SkillsMatching": [{"skill": "Python", "score": 50}]})
+    return json.dumps({"meaning": "Stub meaning of ***.", "origin": "Stub origin.", "sentence": "A stub sentence with ***."})
+
+
+def run_stub_server(port, latency=0.2, jitter=0.1, rate_limit=0.0, error_rate=0.0):
+    """Serves /chat/completions locally with configurable latency, 429s and 500s."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            roll = random.random()
+            if roll < rate_limit:
+                return self._send(429, {'error': {'message': 'stub rate limit'}}, {'Retry-After': '1'})
+            if roll < rate_limit + error_rate:
+                return self._send(500, {'error': {'message': 'stub failure'}})
+            time.sleep(max(0.0, random.gauss(latency, jitter)))
+            prompt = " ".join(m.get('content', '') for m in body.get('messages', []))
+            content = stub_completion(prompt)
+            if body.get('stream'):
+                return self._stream(content)
+            self._send(200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+
+        def _stream(self, content, piece=12):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for i in range(0, len(content), piece):
+                chunk = {'choices': [{'delta': {'content': content[i:i + piece]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(0.01)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def _send(self, status, data, headers=None):
+            raw = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(raw)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('localhost', port), Handler)
+    print(f"Stub LLM server on http://localhost:{port} (latency {latency}s, 429 rate {rate_limit}, "
+          f"500 rate {error_rate})")
+    server.serve_forever()
+
+
+async def load_test(requests, concurrency, deadline, model):
+    client = AsyncLLMClient(max_concurrency=concurrency)
+    messages = [{"role": "user", "content": "Provide the definition of the word 'stub'."}]
+
+    async def one():
+        try:
+            await client.chat(messages, model, deadline=deadline)
+            return True
+        except LLMError:
+            return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    stats = client.snapshot()
+    print(f"{requests} requests in {elapsed:.2f}s ({requests / elapsed:.1f} req/s), "
+          f"{sum(results)} ok, {requests - sum(results)} failed")
+    print(f"  retries {stats['retries']}  rate limited {stats['rate_limited']}  timeouts {stats['timeouts']}")
+    print(f"  latency p50 {stats['latency_p50']:.2f}s  p90 {stats['latency_p90']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub LLM server or load-test the configured endpoint.")
+    parser.add_argument('--stub', action='store_true', help="Serve canned completions locally")
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--latency', type=float, default=0.2, help="Stub mean latency (s)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Stub fraction of 429 responses")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Stub fraction of 500 responses")
+    parser.add_argument('--load-test', type=int, metavar='N', help="Send N requests to LLM_BASE_URL")
+    parser.add_argument('--concurrency', type=int, default=LLM_MAX_CONCURRENCY)
+    parser.add_argument('--deadline', type=float, default=LLM_TIMEOUT)
+    parser.add_argument('--model', default='llama-3.3-70b-versatile')
+    args = parser.parse_args()
+
+    if args.stub:
+        run_stub_server(args.port, args.latency, rate_limit=args.rate_limit, error_rate=args.error_rate)
+    elif args.load_test:
+        asyncio.run(load_test(args.load_test, args.concurrency, args.deadline, args.model))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
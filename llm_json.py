@@ -0,0 +1,206 @@
+"""JSON extraction for LLM output.
+
+Models wrap JSON in code fences, prefix it with prose, or get cut off mid
+object. extract_json() finds the first JSON value in such text and, if it
+is truncated, drops the unfinished member and closes the open brackets so
+the completed fields are kept instead of discarding the whole response. StreamingJSONParser
+does the same incrementally and reports each top-level field of an object
+the moment its value is complete.
+"""
+import json
+
+_DECODER = json.JSONDecoder()
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text, start):
+    """Scans a JSON value from `start`; returns (end, stack, in_string).
+
+    `end` is the index just past the value when it is complete, otherwise
+    None, with `stack` holding the brackets still open.
+    """
+    stack = []
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append(ch)
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                return i + 1, stack, False
+    return None, stack, in_string
+
+
+def repair_json(fragment):
+    """Closes a truncated JSON object/array so it parses; incomplete trailing members are dropped."""
+    end, _, _ = _scan(fragment, 0)
+    if end is not None:
+        return fragment[:end]
+    text = fragment.rstrip()
+    # Try progressively shorter prefixes, cut after a complete member, until one closes cleanly;
+    # cutting right after an opening bracket (leaving an empty container) is the last resort
+    candidates = [text]
+    candidates += [text[:i] for i in range(len(text) - 1, 0, -1) if text[i] == ',']
+    candidates += [text[:i + 1] for i in range(len(text) - 1, 0, -1) if text[i] in '{[']
+    for candidate in candidates:
+        _, open_stack, open_string = _scan(candidate, 0)
+        if open_string:
+            continue
+        closed = candidate.rstrip().rstrip(',') + ''.join(_CLOSERS[b] for b in reversed(open_stack))
+        try:
+            json.loads(closed)
+            return closed
+        except ValueError:
+            continue
+    raise ValueError("Could not repair truncated JSON")
+
+
+def extract_json(text, repair=True):
+    """Returns the first JSON object or array in `text` (fenced, prefixed or truncated).
+
+    Raises ValueError when no JSON value can be recovered.
+    """
+    if text is None:
+        raise ValueError("No text")
+    text = text.strip()
+    start = 0
+    while True:
+        positions = [p for p in (text.find('{', start), text.find('[', start)) if p != -1]
+        if not positions:
+            break
+        start = min(positions)
+        try:
+            value, _ = _DECODER.raw_decode(text, start)
+            return value
+        except ValueError:
+            end, _, _ = _scan(text, start)
+            if end is None and repair:
+                # Ran off the end of the text: a truncated value, not a stray bracket in prose
+                try:
+                    return json.loads(repair_json(text[start:]))
+                except ValueError:
+                    pass
+            start += 1
+    raise ValueError("No JSON value found in response")
+
+
+def validate(data, schema):
+    """Checks `data` against {field: type} or {field: (type, default)}.
+
+    Returns (clean, errors): clean holds every field with the right type
+    (strings are stripped, empty strings count as missing) and defaults for
+    the rest; errors lists the fields that were missing or invalid.
+    """
+    if not isinstance(data, dict):
+        data = {}
+    clean = {}
+    errors = []
+    for field, spec in schema.items():
+        expected, default = spec if isinstance(spec, tuple) else (spec, None)
+        value = data.get(field)
+        if isinstance(value, str) and expected is str:
+            value = value.strip()
+        if isinstance(value, expected) and value != '':
+            clean[field] = value
+        else:
+            errors.append(field)
+            if default is not None:
+                clean[field] = default
+    return clean, errors
+
+
+class StreamingJSONParser:
+    """Incremental parser for a streamed JSON object.
+
+    feed() takes text chunks and returns the (key, value) pairs of top-level
+    members that completed in them. Text before the opening brace (prose,
+    a code fence) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.fields = {}
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self._value_start = None
+        self._key = None
+        self.done = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+        text = self.buffer
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            ch = text[i]
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(text, i, completed)
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ':':
+                    try:
+                        self._key = json.loads(text[self._member_start:i])
+                    except ValueError:
+                        self._key = None
+                    self._value_start = i + 1
+                elif ch == ',':
+                    self._finish_member(text, i, completed)
+                    self._member_start = i + 1
+        self._pos = len(text)
+        return completed
+
+    def _finish_member(self, text, end, completed):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(text[self._value_start:end])
+            except ValueError:
+                value = None
+            if value is not None:
+                self.fields[self._key] = value
+                completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    def result(self):
+        """Best-effort parse of everything received so far."""
+        try:
+            return extract_json(self.buffer)
+        except ValueError:
+            return dict(self.fields)
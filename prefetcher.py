@@ -0,0 +1,126 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+PREFETCH_DEPTH = 3      # how many upcoming words to warm
+PREFETCH_WORKERS = 2    # concurrent background fetches
+
+
+class Prefetcher:
+    """Warms per-word resources (context, audio, ...) for upcoming words in the background.
+
+    Each task is a callable taking a word. Scheduling is de-duplicated per word:
+    owners asking for a word already queued join its owner set. Every
+    reshuffle bumps the owner's generation counter and removes it from the
+    owner sets, so work nobody current still wants is dropped instead of
+    competing with the new order.
+    """
+
+    def __init__(self, tasks, depth=PREFETCH_DEPTH, max_workers=PREFETCH_WORKERS):
+        self.tasks = list(tasks)
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        # Generation counter per owner (e.g. player session); cancelling one owner leaves the others alone
+        self._generations = {}
+        self._pending = {}      # word -> (future, {owner: generation it was scheduled in})
+        self.stats = {'hits': 0, 'misses': 0, 'scheduled': 0, 'completed': 0, 'cancelled': 0, 'errors': 0}
+
+    def add_task(self, task):
+        self.tasks.append(task)
+
+    def schedule(self, words, owner=None):
+        """Queues the first `depth` words for background warming."""
+        with self._lock:
+            generation = self._generations.setdefault(owner, 0)
+            for word in list(words)[:self.depth]:
+                entry = self._pending.get(word)
+                if entry is not None:
+                    entry[1][owner] = generation
+                    continue
+                owners = {owner: generation}
+                future = self._executor.submit(self._run, word, owners)
+                self._pending[word] = (future, owners)
+                self.stats['scheduled'] += 1
+
+    def _is_current(self, owner, generation):
+        # Forgotten owners are never current, whatever generation they reached
+        return owner in self._generations and self._generations[owner] == generation
+
+    def _wanted(self, owners):
+        return any(self._is_current(owner, generation) for owner, generation in owners.items())
+
+    def _run(self, word, owners):
+        try:
+            for task in self.tasks:
+                with self._lock:
+                    wanted = self._wanted(owners)
+                    if not wanted:
+                        self.stats['cancelled'] += 1
+                if not wanted:
+                    return
+                task(word)
+            with self._lock:
+                self.stats['completed'] += 1
+        except Exception as e:
+            print(f"Prefetch error for '{word}': {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+        finally:
+            with self._lock:
+                entry = self._pending.get(word)
+                if entry is not None and entry[1] is owners:
+                    del self._pending[word]
+
+    def cancel(self, owner=None):
+        """Drops the owner's queued work, e.g. after its word order changed.
+
+        A word other owners still want keeps running for them. A fetch that
+        has already started stays pending until it stops, so wait() and a new
+        schedule() of the same word still see it instead of starting another.
+        """
+        with self._lock:
+            if owner in self._generations:
+                self._generations[owner] += 1
+            for word, (future, owners) in list(self._pending.items()):
+                if owners.pop(owner, None) is None or self._wanted(owners):
+                    continue
+                if future.cancel():
+                    # Never started, so _run will not remove it
+                    self.stats['cancelled'] += 1
+                    del self._pending[word]
+
+    def forget(self, owner):
+        """Cancels and releases bookkeeping for an owner that is gone for good."""
+        self.cancel(owner)
+        with self._lock:
+            self._generations.pop(owner, None)
+
+    def wait(self, word, timeout=None):
+        """Blocks until an in-flight prefetch of `word` finishes. Returns True if one was running."""
+        with self._lock:
+            entry = self._pending.get(word)
+        if entry is None:
+            return False
+        try:
+            entry[0].result(timeout=timeout)
+        except Exception:
+            pass
+        return True
+
+    def record(self, hit):
+        with self._lock:
+            self.stats['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._pending)
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            for future, _ in self._pending.values():
+                future.cancel()
+            self._pending = {}
+        self._executor.shutdown(wait=False)
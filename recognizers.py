@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from math import gcd
+
+import numpy as np
+import scipy.io.wavfile as wav
+import speech_recognition as sr
+from scipy.signal import resample_poly
+
+# Configuration
+STT_BACKEND = os.getenv('STT_BACKEND', 'google')            # google | vosk | replay
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', 'models/vosk-model-small-en-us-0.15')
+STT_FIXTURES_DIR = os.getenv('STT_FIXTURES_DIR', 'fixtures/audio')
+STT_REPLAY_SPEED = float(os.getenv('STT_REPLAY_SPEED', '1.0'))  # 0 replays as fast as possible
+REPLAY_BLOCK = 1024
+
+# Words a speller is expected to say: letter names (and their spellings) plus the voice commands
+LETTER_NAMES = {
+    'a': ['a', 'ay'], 'b': ['b', 'bee', 'be'], 'c': ['c', 'see', 'sea'], 'd': ['d', 'dee'],
+    'e': ['e'], 'f': ['f', 'ef'], 'g': ['g', 'gee'], 'h': ['h', 'aitch'], 'i': ['i', 'eye'],
+    'j': ['j', 'jay'], 'k': ['k', 'kay'], 'l': ['l', 'el'], 'm': ['m', 'em'], 'n': ['n', 'en'],
+    'o': ['o', 'oh'], 'p': ['p', 'pee'], 'q': ['q', 'cue', 'queue'], 'r': ['r', 'are'],
+    's': ['s', 'es'], 't': ['t', 'tee', 'tea'], 'u': ['u', 'you'], 'v': ['v', 'vee'],
+    'w': ['w', 'double u'], 'x': ['x', 'ex'], 'y': ['y', 'why'], 'z': ['z', 'zee', 'zed'],
+}
+COMMAND_PHRASES = [
+    'meaning', 'definition', 'origin', 'root', 'sentence', 'example', 'pause', 'stop', 'wait',
+    'hold on', 'repeat', 'repeat the word', 'say the word again', 'word again', 'the word', 'please',
+]
+
+
+def letter_grammar(expected_words=None):
+    """Phrase list for a constrained recognizer: letters, commands and the word being spelled."""
+    phrases = [name for names in LETTER_NAMES.values() for name in names] + COMMAND_PHRASES
+    for word in expected_words or []:
+        phrases.append(str(word).lower())
+    phrases.append('[unk]')
+    return phrases
+
+
+class RecognizerBackend:
+    """Turns recorded speech (sr.AudioData) into a transcript."""
+
+    name = 'base'
+
+    def recognize(self, audio, expected_words=None):
+        """Returns the transcript, or None when nothing intelligible was heard."""
+        raise NotImplementedError
+
+
+class GoogleRecognizer(RecognizerBackend):
+    """Google Web Speech API via speech_recognition (network, no setup)."""
+
+    name = 'google'
+
+    def __init__(self):
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio, expected_words=None):
+        try:
+            return self._recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return None
+
+
+_vosk_models = {}
+_vosk_lock = threading.Lock()
+
+
+def _load_vosk_model(model_path):
+    """Loads a Vosk model once per process; every recognizer instance shares it."""
+    with _vosk_lock:
+        if model_path not in _vosk_models:
+            from vosk import Model
+            print(f"Loading Vosk model from {model_path}...")
+            _vosk_models[model_path] = Model(model_path)
+        return _vosk_models[model_path]
+
+
+class VoskRecognizer(RecognizerBackend):
+    """Offline CPU recognition with Vosk, restricted to a letter/command grammar.
+
+    The model is loaded on construction and kept warm; only the lightweight
+    KaldiRecognizer is created per call, because its grammar includes the
+    word currently being spelled.
+    """
+
+    name = 'vosk'
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, constrained=True):
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at '{model_path}'. Set VOSK_MODEL_PATH.")
+        self.model = _load_vosk_model(model_path)
+        self.constrained = constrained
+
+    def recognize(self, audio, expected_words=None):
+        from vosk import KaldiRecognizer
+        if self.constrained:
+            recognizer = KaldiRecognizer(self.model, audio.sample_rate, json.dumps(letter_grammar(expected_words)))
+        else:
+            recognizer = KaldiRecognizer(self.model, audio.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get('text', '').replace('[unk]', '').strip()
+        return text or None
+
+
+class ReplayRecognizer(RecognizerBackend):
+    """Stub backend that replays WAV fixtures instead of using a microphone and an STT service.
+
+    Each fixture is `name.wav` plus `name.json` ({"transcript": ..., "word": ...}).
+    audio_source() streams the next fixture's samples into the capture
+    callback (in real time, or faster with `speed`), and recognize() returns
+    that fixture's transcript, so the whole listen -> check path runs offline.
+    """
+
+    name = 'replay'
+
+    def __init__(self, fixtures_dir=STT_FIXTURES_DIR, speed=STT_REPLAY_SPEED):
+        self.fixtures = []
+        for file_name in sorted(os.listdir(fixtures_dir)):
+            if not file_name.lower().endswith('.wav'):
+                continue
+            base = os.path.join(fixtures_dir, file_name[:-4])
+            meta = {}
+            if os.path.exists(base + '.json'):
+                with open(base + '.json') as f:
+                    meta = json.load(f)
+            rate, samples = wav.read(base + '.wav')
+            if samples.ndim > 1:
+                samples = samples.mean(axis=1).astype(np.int16)
+            self.fixtures.append({'name': file_name, 'rate': rate, 'samples': samples, **meta})
+        if not self.fixtures:
+            raise FileNotFoundError(f"No WAV fixtures in '{fixtures_dir}'.")
+        self.speed = speed
+        self._index = -1
+        self.current = None
+
+    def audio_source(self, sample_rate, callback):
+        """Drop-in replacement for the microphone stream: feeds the next fixture to `callback`."""
+        self._index = (self._index + 1) % len(self.fixtures)
+        self.current = self.fixtures[self._index]
+        return _ReplayStream(self.current, sample_rate, callback, self.speed)
+
+    def recognize(self, audio, expected_words=None):
+        if self.current is None:
+            return None
+        return self.current.get('transcript') or None
+
+
+class _ReplayStream:
+    """Context manager mimicking sd.InputStream for a fixture; trailing silence follows the clip."""
+
+    def __init__(self, fixture, sample_rate, callback, speed):
+        samples = fixture['samples']
+        if fixture['rate'] != sample_rate:
+            divisor = gcd(fixture['rate'], sample_rate)
+            samples = resample_poly(samples, sample_rate // divisor, fixture['rate'] // divisor)
+        self.samples = np.clip(samples, -32768, 32767).astype(np.int16)
+        self.sample_rate = sample_rate
+        self.callback = callback
+        self.speed = speed
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        silence = np.zeros(REPLAY_BLOCK, dtype=np.int16)
+        position = 0
+        while not self._stop.is_set():
+            block = self.samples[position:position + REPLAY_BLOCK]
+            position += REPLAY_BLOCK
+            if len(block) < REPLAY_BLOCK:
+                block = np.concatenate((block, silence[:REPLAY_BLOCK - len(block)]))
+            self.callback(block.reshape(-1, 1), REPLAY_BLOCK, None, None)
+            if self.speed > 0:
+                time.sleep(REPLAY_BLOCK / self.sample_rate / self.speed)
+            elif position % (REPLAY_BLOCK * 64) == 0:
+                time.sleep(0)  # let the consumer run
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def create_recognizer(backend=STT_BACKEND):
+    """Builds the configured recognizer backend."""
+    if backend == 'vosk':
+        return VoskRecognizer()
+    if backend == 'replay':
+        return ReplayRecognizer()
+    return GoogleRecognizer()
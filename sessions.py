@@ -0,0 +1,196 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from spelling_bee import normalize_filters, spelling_matches
+from events import EventChannel
+
+# Configuration
+SESSION_COOKIE = 'bee_session'
+IDLE_TIMEOUT = 30 * 60                  # seconds before an inactive player is dropped
+MEMORY_BUDGET = 64 * 1024 * 1024        # approximate bytes across all sessions
+SESSION_OVERHEAD = 4096                 # rough fixed cost of one session object
+
+
+class PlayerSession:
+    """Game state for one browser: filters, queue cursor, score and current word.
+
+    Word data, the context cache, the LLM client and the prefetcher live on
+    the shared SpellingBeeGame, so a session only holds an array of catalog
+    positions plus a few scalars.
+    """
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.filters = normalize_filters()
+        self.order = 'random'
+        self.score = {'correct': 0, 'incorrect': 0}
+        self.current_word = None
+        self.current_details = None
+        # Serializes requests from the same browser (e.g. two open tabs)
+        self.lock = threading.RLock()
+        self.speech_lock = threading.Lock()
+        # Prompts handed to a speaking thread that have not finished yet; the listener waits for them
+        self._speech_pending = 0
+        self._speech_done = threading.Condition()
+        # speaking/listening/result events pushed to the browser over SSE
+        self.events = EventChannel()
+        self.last_seen = time.time()
+        self.load_words()
+
+    def load_words(self):
+        self.game.prefetcher.cancel(owner=self.id)
+        self.queue = self.game.build_queue(self.filters, self.order)
+        self.game.prefetcher.schedule(self.game.peek_words(self.queue), owner=self.id)
+        self.game.prerender_speech(self.queue, owner=self.id)
+
+    def set_filters(self, year=None, list_type=None, difficulty=None):
+        self.filters = normalize_filters(year, list_type, difficulty)
+        self.load_words()
+
+    def set_order(self, order):
+        self.order = order
+        self.load_words()
+
+    def get_next_word(self):
+        if self.queue.signature != self.game.catalog.signature:
+            # The shared catalog was reloaded, so our positions are stale
+            self.load_words()
+        self.current_word = self.game.serve_next(self.queue, owner=self.id)
+        self.current_details = None
+        return self.current_word
+
+    def check_spelling(self, user_input, target_word):
+        if not user_input: return False
+        is_correct = spelling_matches(user_input, target_word)
+        if is_correct:
+            self.score['correct'] += 1
+        else:
+            self.score['incorrect'] += 1
+        return is_correct
+
+    def speech_queued(self):
+        with self._speech_done:
+            self._speech_pending += 1
+
+    def speech_finished(self):
+        with self._speech_done:
+            self._speech_pending -= 1
+            self._speech_done.notify_all()
+
+    def wait_for_speech(self, cancel_event=None):
+        """Blocks until every queued prompt has been spoken. Returns False if cancelled first."""
+        with self._speech_done:
+            while self._speech_pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                self._speech_done.wait(0.1)
+        return cancel_event is None or not cancel_event.is_set()
+
+    def memory_usage(self):
+        return SESSION_OVERHEAD + self.queue.nbytes()
+
+    def close(self):
+        self.game.prefetcher.forget(self.id)
+        if self.game.tts is not None:
+            self.game.tts.cancel_prerender(self.id)
+        self.events.close()
+
+
+class SessionStore:
+    """Maps session ids to PlayerSession objects with idle and memory-based eviction."""
+
+    def __init__(self, game, idle_timeout=IDLE_TIMEOUT, memory_budget=MEMORY_BUDGET, on_close=None):
+        self.game = game
+        # Called with each evicted session, e.g. to cancel its listen jobs so it stops holding the microphone
+        self.on_close = on_close
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self._sessions = OrderedDict()  # least recently used first
+        self._replacements = {}         # unknown/expired id -> id of the session created for it
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'evicted_idle': 0, 'evicted_memory': 0}
+
+    def get(self, session_id):
+        """Returns the session for `session_id`, creating a fresh one if it is unknown or expired."""
+        now = time.time()
+        evicted = []
+        with self._lock:
+            evicted += self._evict_idle(now)
+            session = self._touch(session_id, now)
+            if session is not None:
+                evicted += self._evict_over_budget(keep=session.id)
+        if session is None:
+            # Building a session loads its queue and schedules prefetches, so it happens outside the lock
+            created = PlayerSession(secrets.token_urlsafe(16), self.game)
+            with self._lock:
+                # A concurrent request with the same id may have stored its session first: reuse that one
+                session = self._touch(session_id, now)
+                if session is None:
+                    session, created = created, None
+                    session.last_seen = now
+                    self._sessions[session.id] = session
+                    if session_id:
+                        self._replacements[session_id] = session.id
+                    self.stats['created'] += 1
+                evicted += self._evict_over_budget(keep=session.id)
+            if created is not None:
+                evicted.append(created)
+        for old in evicted:
+            if self.on_close is not None:
+                self.on_close(old)
+            old.close()
+        return session
+
+    def _touch(self, session_id, now):
+        """The stored session for session_id (or the one that replaced it), marked as just used."""
+        if not session_id:
+            return None
+        session = self._sessions.get(session_id)
+        if session is None and session_id in self._replacements:
+            session = self._sessions.get(self._replacements[session_id])
+            if session is None:
+                del self._replacements[session_id]
+        if session is not None:
+            self._sessions.move_to_end(session.id)
+            session.last_seen = now
+        return session
+
+    def _evict_idle(self, now):
+        evicted = []
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen < self.idle_timeout:
+                break
+            evicted.append(self._sessions.pop(oldest.id))
+            self.stats['evicted_idle'] += 1
+        self._drop_replacements(evicted)
+        return evicted
+
+    def _evict_over_budget(self, keep):
+        evicted = []
+        total = sum(s.memory_usage() for s in self._sessions.values())
+        for session_id in list(self._sessions):
+            if total <= self.memory_budget:
+                break
+            if session_id == keep:
+                continue
+            session = self._sessions.pop(session_id)
+            total -= session.memory_usage()
+            evicted.append(session)
+            self.stats['evicted_memory'] += 1
+        self._drop_replacements(evicted)
+        return evicted
+
+    def _drop_replacements(self, evicted):
+        if evicted and self._replacements:
+            gone = {session.id for session in evicted}
+            self._replacements = {old: new for old, new in self._replacements.items() if new not in gone}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats,
+                        active=len(self._sessions),
+                        memory_bytes=sum(s.memory_usage() for s in self._sessions.values()))
@@ -0,0 +1,209 @@
+"""Persistent TF-IDF similarity index with incremental adds and top-K queries.
+
+The vectorizer is fitted once; queries are transformed with the stored
+vocabulary and IDF weights and scored against the stored document rows
+with one sparse matrix-vector product. Documents live in CSR segments
+saved as .npy files that are memory-mapped on load, so opening a large
+index costs almost nothing and the OS pages rows in as they are scored.
+
+add() appends a new segment scored with the fitted vocabulary (terms the
+index has never seen are ignored, and IDF weights stay as fitted); save()
+writes only the new segments, and compact() merges them back into one.
+
+Layout of an index directory:
+    meta.json            parameters, segment list, document count
+    vocab.json           terms in column order
+    idf.npy              IDF weight per column
+    ids.json             document id per row
+    seg-NNNNNN.{data,indices,indptr}.npy   CSR arrays of one segment
+"""
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Configuration
+FORMAT_VERSION = 1
+DTYPE = np.float32
+# TfidfVectorizer settings stored with the index (defaults match the original recipe matcher)
+DEFAULT_PARAMS = {"lowercase": True, "sublinear_tf": False, "norm": "l2", "stop_words": None}
+
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SimilarityIndex:
+    """Cosine-similarity search over TF-IDF document vectors.
+
+    Build with fit() or open with load(); query() returns the top-k
+    (id, score) pairs, best first.
+    """
+
+    def __init__(self, vectorizer, segments, ids, params, path=None, saved_segments=()):
+        self.vectorizer = vectorizer
+        self.segments = list(segments)        # CSR matrices, rows in document order
+        self.ids = list(ids)
+        self.params = params
+        self.path = path
+        self._saved = list(saved_segments)    # names of segments already on disk, aligned with self.segments
+
+    @classmethod
+    def fit(cls, texts, ids=None, **params):
+        """Fits the vocabulary and IDF weights on texts and indexes them."""
+        texts = list(texts)
+        params = {**DEFAULT_PARAMS, **params}
+        vectorizer = TfidfVectorizer(dtype=DTYPE, **params)
+        matrix = vectorizer.fit_transform(texts).tocsr()
+        ids = list(range(len(texts))) if ids is None else list(ids)
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts differ in length")
+        return cls(vectorizer, [matrix], ids, params)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Opens a saved index; segment arrays are memory-mapped unless mmap is False."""
+        meta = _read_json(os.path.join(path, 'meta.json'))
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format: {meta.get('format')}")
+        terms = _read_json(os.path.join(path, 'vocab.json'))
+        params = dict(meta['params'])
+        if 'ngram_range' in params:
+            params['ngram_range'] = tuple(params['ngram_range'])  # JSON turned it into a list
+        vectorizer = TfidfVectorizer(dtype=DTYPE, vocabulary={term: i for i, term in enumerate(terms)}, **params)
+        vectorizer.idf_ = np.load(os.path.join(path, 'idf.npy'))
+        mode = 'r' if mmap else None
+        segments = []
+        names = []
+        for segment in meta['segments']:
+            base = os.path.join(path, segment['name'])
+            arrays = [np.load(f"{base}.{part}.npy", mmap_mode=mode) for part in ('data', 'indices', 'indptr')]
+            segments.append(sp.csr_matrix(tuple(arrays), shape=(segment['rows'], len(terms)), copy=False))
+            names.append(segment['name'])
+        # ids.json is written before meta.json, so it may list documents of a save still in progress
+        ids = _read_json(os.path.join(path, 'ids.json'))[:meta['documents']]
+        return cls(vectorizer, segments, ids, params, path, names)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def vocabulary_size(self):
+        return len(self.vectorizer.vocabulary_)
+
+    def transform(self, texts):
+        """TF-IDF rows for texts using the fitted vocabulary and IDF weights."""
+        return self.vectorizer.transform(list(texts)).tocsr()
+
+    def add(self, texts, ids=None):
+        """Indexes more documents without refitting; returns the ids they were given."""
+        texts = list(texts)
+        if ids is None:
+            start = len(self.ids)
+            ids = list(range(start, start + len(texts)))
+        ids = list(ids)
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts differ in length")
+        if not texts:
+            return ids
+        rows = self.transform(texts)
+        if len(self._saved) < len(self.segments):
+            # Grow the unsaved tail segment instead of scoring many tiny ones
+            self.segments[-1] = sp.vstack([self.segments[-1], rows], format='csr')
+        else:
+            self.segments.append(rows)
+        self.ids.extend(ids)
+        return ids
+
+    def scores(self, text):
+        """Cosine similarity of text to every document, in row order."""
+        query = self.transform([text])
+        if query.nnz == 0:
+            return np.zeros(len(self.ids), dtype=DTYPE)
+        # Rows are L2-normalized, so a dot product with the dense query vector is the cosine
+        dense = query.toarray().ravel()
+        return np.concatenate([segment @ dense for segment in self.segments])
+
+    def query(self, text, k=10):
+        """Returns up to k (id, score) pairs, highest score first."""
+        scores = self.scores(text)
+        n = len(scores)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        # Highest score first; ties in document order
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def save(self, path=None):
+        """Writes the index; an index already saved at path only writes its new segments."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the index to")
+        os.makedirs(path, exist_ok=True)
+        if path != self.path:
+            self._saved = []
+            terms = [None] * self.vocabulary_size
+            for term, column in self.vectorizer.vocabulary_.items():
+                terms[column] = term
+            _write_json(os.path.join(path, 'vocab.json'), terms)
+            np.save(os.path.join(path, 'idf.npy'), self.vectorizer.idf_)
+
+        for n in range(len(self._saved), len(self.segments)):
+            self._saved.append(self._write_segment(path, self.segments[n]))
+        _write_json(os.path.join(path, 'ids.json'), self.ids)
+        # Metadata last: a reader never sees a segment list pointing at files not yet written
+        _write_json(os.path.join(path, 'meta.json'), {
+            "format": FORMAT_VERSION,
+            "params": self.params,
+            "documents": len(self.ids),
+            "segments": [{"name": name, "rows": segment.shape[0], "nnz": int(segment.nnz)}
+                         for name, segment in zip(self._saved, self.segments)],
+        })
+        self.path = path
+        return path
+
+    def _write_segment(self, path, matrix):
+        existing = [name for name in os.listdir(path) if name.startswith('seg-') and name.endswith('.indptr.npy')]
+        number = max((int(name[4:10]) for name in existing), default=0) + 1
+        name = f"seg-{number:06d}"
+        # One index dtype for both arrays so scipy can wrap the memory maps without copying
+        index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+        for part, array in (('data', matrix.data.astype(DTYPE, copy=False)),
+                            ('indices', matrix.indices.astype(index_dtype, copy=False)),
+                            ('indptr', matrix.indptr.astype(index_dtype, copy=False))):
+            target = os.path.join(path, f"{name}.{part}.npy")
+            with open(target + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(target + '.tmp', target)
+        return name
+
+    def compact(self):
+        """Merges all segments into one and, when saved, rewrites the index with it."""
+        if len(self.segments) > 1:
+            self.segments = [sp.vstack(self.segments, format='csr')]
+            old = self._saved
+            self._saved = []
+            if self.path is not None:
+                self.save()
+                for name in old:
+                    for part in ('data', 'indices', 'indptr'):
+                        try:
+                            os.remove(os.path.join(self.path, f"{name}.{part}.npy"))
+                        except OSError:
+                            pass  # still mapped (Windows); harmless, it is no longer listed
+        return self
@@ -1,77 +1,204 @@
+"""Bulk Bark audio generation for the whole word bank.
+
+Words are read from the database, checked in chunks and synthesized in batches
+(one forward pass per batch). Each finished batch is recorded in the
+`audio_manifest` table, keyed by word and voice preset, so an interrupted
+run resumes where it stopped and words that already have audio are skipped.
+Output files are named by a hash of word + preset, which stays the same
+across database rebuilds. With --worker, batches go to a running
+bark_worker.py instead of loading the model in this process.
+
+Usage:
+    python speak_words.py --batch-size 8 --threads 8
+    python speak_words.py --worker localhost:6100
+    python speak_words.py --device cuda --half
+    python speak_words.py --limit 5            # quick test
+"""
+import argparse
+import hashlib
+import os
 import sqlite3
-import torch
-from transformers import AutoProcessor, BarkModel
+import time
+
+import numpy as np
 import scipy.io.wavfile
-import os
+
+from bark_worker import BarkClient, WORKER_ADDRESS
 
 # Configuration
 DB_FILE = 'my_database.db'
 TABLE_NAME = 'bee_words'
+MANIFEST_TABLE = 'audio_manifest'
 OUTPUT_DIR = 'audio_output'
+MODEL_NAME = 'suno/bark'
+VOICE_PRESET = 'v2/en_speaker_6'
+SAMPLE_RATE = 24000     # Bark generates at 24kHz
+BATCH_SIZE = 8          # words per forward pass
+CHUNK_SIZE = 500        # rows read from the database at a time
+
+
+def audio_id(word, voice_preset):
+    """Stable file id for a word + voice, independent of database row ids."""
+    return hashlib.sha1(f"{voice_preset}\x00{word}".encode('utf-8')).hexdigest()[:16]
 
-def setup_model():
+
+def clean_text(text):
+    return str(text).replace('**', '').replace('  ', ' ').strip()
+
+
+def setup_model(model_name=MODEL_NAME, device=None, threads=None, dtype='float32'):
     """Load the Bark model and processor."""
+    import torch
+    from transformers import AutoProcessor, BarkModel
     print("Loading Bark model... (this may take a moment)")
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    processor = AutoProcessor.from_pretrained("suno/bark")
-    model = BarkModel.from_pretrained("suno/bark").to(device)
-    print(f"Model loaded on {device}.")
+    if threads:
+        torch.set_num_threads(threads)
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    processor = AutoProcessor.from_pretrained(model_name)
+    model = BarkModel.from_pretrained(model_name, torch_dtype=getattr(torch, dtype)).to(device)
+    model.eval()
+    print(f"Model loaded on {device} ({torch.get_num_threads()} threads).")
     return processor, model, device
 
-def generate_audio(text, processor, model, device, filename):
-    """Generate audio for a given text and save it."""
-    inputs = processor(text, voice_preset="v2/en_speaker_6").to(device)
-    
-    with torch.no_grad():
-        # pad_token_id=10000 avoids the warning
-        audio_array = model.generate(**inputs, pad_token_id=10000)
-    
-    audio_array = audio_array.cpu().numpy().squeeze()
-    
-    # Bark generates at 24kHz
-    sample_rate = 24000
-    scipy.io.wavfile.write(filename, sample_rate, audio_array)
-    print(f"Saved: {filename}")
+
+def ensure_manifest(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            word TEXT NOT NULL,
+            voice TEXT NOT NULL,
+            file TEXT NOT NULL,
+            seconds REAL,
+            created_at REAL,
+            PRIMARY KEY (word, voice)
+        )
+    """)
+    conn.commit()
+
+
+def done_words(conn, words, voice_preset, output_dir):
+    """Returns the words of `words` that already have audio for this preset on disk."""
+    placeholders = ",".join("?" * len(words))
+    rows = conn.execute(
+        f"SELECT word, file FROM {MANIFEST_TABLE} WHERE voice = ? AND word IN ({placeholders})",
+        [voice_preset, *words]
+    ).fetchall()
+    return {word for word, file in rows if os.path.exists(os.path.join(output_dir, file))}
+
+
+def iter_words(conn, chunk_size=CHUNK_SIZE, limit=None):
+    """Yields lists of unique display words in chunks.
+
+    The word list is read up front: the caller commits manifest rows on the
+    same connection between chunks, which must not happen while a cursor is
+    still reading.
+    """
+    query = f"SELECT DISTINCT clean_word FROM {TABLE_NAME} ORDER BY clean_word"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    words = [w for w in (clean_text(row[0]) for row in conn.execute(query).fetchall()) if w]
+    for i in range(0, len(words), chunk_size):
+        yield words[i:i + chunk_size]
+
+
+def generate_batch(texts, processor, model, device, voice_preset=VOICE_PRESET):
+    """Synthesizes a batch of texts in one forward pass. Returns one float array per text."""
+    import torch
+    inputs = processor(texts, voice_preset=voice_preset).to(device)
+    with torch.inference_mode():
+        # pad_token_id=10000 avoids the warning; output lengths let us drop each item's padding
+        audio, lengths = model.generate(**inputs, pad_token_id=10000, return_output_lengths=True)
+    audio = audio.float().cpu().numpy()
+    lengths = lengths.cpu().numpy()
+    return [audio[i, :lengths[i]] for i in range(len(texts))]
+
+
+def save_wav(path, samples):
+    tmp_path = path + '.part'
+    scipy.io.wavfile.write(tmp_path, SAMPLE_RATE, np.asarray(samples, dtype=np.float32))
+    os.replace(tmp_path, path)
+
 
 def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    parser = argparse.ArgumentParser(description="Pre-render Bark audio for every word in the database.")
+    parser.add_argument('--db', default=DB_FILE)
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--voice', default=VOICE_PRESET, help="Bark voice preset")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--limit', type=int, help="Only process the first N words")
+    parser.add_argument('--threads', type=int, help="torch CPU threads")
+    parser.add_argument('--device', help="cpu or cuda (default: cuda if available)")
+    parser.add_argument('--dtype', choices=['float32', 'float16', 'bfloat16'], default='float32',
+                        help="Weight precision (float16 needs a GPU)")
+    parser.add_argument('--half', dest='dtype', action='store_const', const='float16',
+                        help="Half-precision weights, same as --dtype float16")
+    parser.add_argument('--worker', nargs='?', const=WORKER_ADDRESS,
+                        help="Send batches to a running bark_worker.py (host:port)")
+    parser.add_argument('--force', action='store_true', help="Regenerate words that already have audio")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
 
     # 1. Connect to Database
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    # Get the first column (assuming it contains the words)
-    cursor.execute(f"SELECT * FROM {TABLE_NAME} LIMIT 5") # Limiting to 5 for testing
-    rows = cursor.fetchall()
-    
-    if not rows:
-        print("No data found in database.")
-        return
-
-    # 2. Setup TTS Model
-    try:
-        processor, model, device = setup_model()
-    except Exception as e:
-        print(f"Failed to load model. Ensure transformers and torch are installed.\nError: {e}")
-        return
+    conn = sqlite3.connect(args.db)
+    ensure_manifest(conn)
+
+    # 2. Setup TTS Model (loaded lazily, so a fully rendered bank never loads it)
+    model_state = None
+    client = BarkClient(args.worker) if args.worker else None
 
     # 3. Process Words
-    print("Generating audio for the first 5 entries...")
-    for i, row in enumerate(rows):
-        # Assuming the first element of the tuple is the text
-        text = str(row[0]).strip()
-        if not text:
-            continue
-            
-        # Clean text slightly if needed
-        clean_text = text.replace('**', '').replace('  ', ' ').strip()
-        
-        filename = os.path.join(OUTPUT_DIR, f"word_{i}_{clean_text[:10]}.wav")
-        generate_audio(clean_text, processor, model, device, filename)
-
-    print("Done!")
+    generated = skipped = failed = 0
+    synth_seconds = 0.0
+    start = time.perf_counter()
+    for chunk in iter_words(conn, args.chunk_size, args.limit):
+        already = set() if args.force else done_words(conn, chunk, args.voice, args.output)
+        skipped += len(already)
+        todo = [w for w in chunk if w not in already]
+
+        for i in range(0, len(todo), args.batch_size):
+            batch = todo[i:i + args.batch_size]
+            if client is None and model_state is None:
+                try:
+                    model_state = setup_model(device=args.device, threads=args.threads, dtype=args.dtype)
+                except Exception as e:
+                    print(f"Failed to load model. Ensure transformers and torch are installed.\nError: {e}")
+                    conn.close()
+                    return
+
+            t0 = time.perf_counter()
+            try:
+                if client is not None:
+                    clips = client.synthesize(batch, args.voice)
+                else:
+                    clips = generate_batch(batch, *model_state, args.voice)
+            except Exception as e:
+                print(f"Batch failed ({', '.join(batch)}): {e}")
+                failed += len(batch)
+                continue
+            synth_seconds += time.perf_counter() - t0
+
+            # Checkpoint: files first, then the manifest rows that mark them done
+            records = []
+            for word, samples in zip(batch, clips):
+                file_name = f"{audio_id(word, args.voice)}.wav"
+                save_wav(os.path.join(args.output, file_name), samples)
+                records.append((word, args.voice, file_name, len(samples) / SAMPLE_RATE, time.time()))
+            conn.executemany(f"INSERT OR REPLACE INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?)", records)
+            conn.commit()
+
+            generated += len(batch)
+            elapsed = time.perf_counter() - start
+            print(f"Generated {generated} words ({skipped} skipped) - {generated / elapsed:.2f} words/s")
+
+    elapsed = time.perf_counter() - start
+    rate = generated / synth_seconds if synth_seconds else 0.0
+    if client is not None:
+        client.close()
+    print(f"Done! {generated} generated, {skipped} already present, {failed} failed in {elapsed:.1f}s "
+          f"({rate:.2f} words/s of synthesis).")
     conn.close()
 
+
 if __name__ == "__main__":
     main()
@@ -1,309 +1,451 @@
 import sounddevice as sd
-import subprocess
-import scipy.io.wavfile as wav
 import numpy as np
+from math import gcd
+from scipy.signal import resample_poly
 import os
-import sqlite3
-import random
 import time
 import speech_recognition as sr
 import queue
-import pandas as pd
+import json
+import threading
 
 
-from groq import Groq
 from dotenv import load_dotenv
+from context_cache import ContextCache, normalize_word
+from llm_client import get_llm_client, is_configured as llm_configured
+from llm_json import extract_json, validate, StreamingJSONParser
+from prefetcher import Prefetcher
+from word_sync import sync_excel_to_db, spelling_key
+from word_catalog import WordCatalog
+from word_queue import WordQueue, save_queue_state, load_queue_state
+from vad import VoiceActivityDetector
+from recognizers import create_recognizer, GoogleRecognizer, STT_BACKEND
+from tts import TextToSpeech, PRERENDER_AHEAD
+from spelling_interpreter import SpellingIndex, interpret
 
 # Load environment variables
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 # Configuration
 DB_FILE = 'my_database.db'
 TABLE_NAME = 'bee_words'
 EXCEL_FILE = 'word_list.xlsx'
-TEMP_WAV = 'temp_recording.wav'
 SAMPLE_RATE = 44100
+# Audio is resampled to this rate before recognition (speech needs no more); None sends it as captured
+STT_SAMPLE_RATE = 16000
 DURATION = 10 
+CONTEXT_MODEL = 'llama-3.3-70b-versatile'
+# Bump when the context prompt changes so cached answers from the old prompt are ignored
+CONTEXT_PROMPT_VERSION = 'v1'
+FALLBACK_CONTEXT = {"meaning": "No definition available.", "origin": "Origin unknown.", "sentence": "No example sentence available."}
+CONTEXT_SCHEMA = {key: str for key in FALLBACK_CONTEXT}
+CONTEXT_BATCH_SIZE = 25         # words per bulk context request
+CONTEXT_BATCH_RETRIES = 2       # extra rounds for words missing from a bulk response
+CONTEXT_DEADLINE = 20           # seconds for a single-word context call, retries included
+CONTEXT_BATCH_DEADLINE = 90     # seconds for one bulk context call
+
+def normalize_filters(year=None, list_type=None, difficulty=None):
+    """Maps UI filter values to catalog filters ('all' and empty values mean no filter)."""
+    return {
+        'year': str(year) if year and str(year).lower() != 'all' else None,
+        'list': str(list_type) if list_type and str(list_type).lower() != 'all' else None,
+        'difficulty': str(difficulty) if difficulty and str(difficulty).lower() != 'all' else None
+    }
+
+def to_audio_data(samples, sample_rate, target_rate=STT_SAMPLE_RATE):
+    """Wraps int16 mono samples as sr.AudioData, optionally resampled to `target_rate`."""
+    if target_rate and target_rate != sample_rate and len(samples):
+        divisor = gcd(sample_rate, target_rate)
+        resampled = resample_poly(samples, target_rate // divisor, sample_rate // divisor)
+        samples = np.clip(resampled, -32768, 32767).astype(np.int16)
+        sample_rate = target_rate
+    return sr.AudioData(samples.tobytes(), sample_rate, 2)
+
+def microphone_source(sample_rate, callback):
+    """Default audio source: the system microphone as a mono int16 stream."""
+    return sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16', callback=callback)
+
+def spelling_matches(user_input, target_word):
+    if not user_input: return False
+    clean_input = user_input.replace(" ", "").lower()
+    return clean_input == spelling_key(target_word)
 
 class SpellingBeeGame:
-    def __init__(self, db_file=DB_FILE, order='random'):
+    def __init__(self, db_file=DB_FILE, order='random', recognizer=None):
         self.db_file = db_file
-        self.words = []
+        self.queue = WordQueue([])
         self.current_word = None
         self.score = {'correct': 0, 'incorrect': 0}
         self.order = order
-        self.filters = {'year': None, 'list': None, 'difficulty': None}
+        self.filters = normalize_filters()
+        # Any factory taking the sample rate and returning an object with process()/speech_started
+        self.vad_factory = VoiceActivityDetector
+
+        # Speech recognition backend (STT_BACKEND); replay backends also supply their own audio
+        if recognizer is None:
+            try:
+                recognizer = create_recognizer(STT_BACKEND)
+            except Exception as e:
+                print(f"Warning: STT backend '{STT_BACKEND}' unavailable ({e}), using Google.")
+                recognizer = GoogleRecognizer()
+        self.recognizer = recognizer
+        self.audio_source = getattr(recognizer, 'audio_source', microphone_source)
+        # One microphone and one speaker for every player: playback and capture never overlap
+        self.audio_lock = threading.Lock()
         
-        # Setup Groq
-        if GROQ_API_KEY:
-            self.client = Groq(api_key=GROQ_API_KEY)
+        # Shared LLM client (pooled connections, deadlines, retries, concurrency cap)
+        if llm_configured():
+            self.client = get_llm_client()
         else:
             self.client = None
             print("Warning: GROQ_API_KEY not found in .env file.")
+
+        self.context_cache = ContextCache(db_file, f"{CONTEXT_MODEL}:{CONTEXT_PROMPT_VERSION}")
+        self.prefetcher = Prefetcher([self._cached_context])
+
+        # Spoken prompts are rendered once and replayed from the on-disk audio cache
+        try:
+            self.tts = TextToSpeech()
+            self.prefetcher.add_task(self.tts.warm)
+        except Exception as e:
+            print(f"Warning: TTS unavailable ({e}), speech will only be printed.")
+            self.tts = None
             
         # Sync database with Excel if it exists
         if os.path.exists(EXCEL_FILE):
             self.sync_excel_to_db(EXCEL_FILE)
-            
+
+        self.catalog = WordCatalog(db_file)
+        self._spelling_index = None
+        self._spelling_index_lock = threading.Lock()
         self.load_words()
 
-    def sync_excel_to_db(self, excel_path):
-        """Standardizes and syncs Excel data to the SQLite database."""
+    def sync_excel_to_db(self, excel_path, force=False):
+        """Standardizes and syncs Excel data to the SQLite database (skipped when unchanged)."""
         try:
-            print(f"Syncing {excel_path} to database...")
-            df = pd.read_excel(excel_path)
-            
-            # Fuzzy match column names
-            col_map = {}
-            for col in df.columns:
-                c_clean = str(col).strip().lower()
-                if 'word' in c_clean: col_map['word'] = col
-                elif 'year' in c_clean: col_map['year'] = col
-                elif 'difficulty' in c_clean or 'level' in c_clean: col_map['difficulty'] = col
-                elif 'list' in c_clean: col_map['list'] = col
-            
-            print(f"Detected columns: {col_map}")
-            
-            # Map required columns
-            data_to_store = pd.DataFrame()
-            if 'word' in col_map:
-                data_to_store['word'] = df[col_map['word']].astype(str).str.strip()
-            if 'year' in col_map:
-                data_to_store['year'] = df[col_map['year']].astype(str).str.strip()
-            if 'difficulty' in col_map:
-                data_to_store['difficulty'] = df[col_map['difficulty']].astype(str).str.strip()
-            if 'list' in col_map:
-                data_to_store['list'] = df[col_map['list']].astype(str).str.strip()
-            
-            # Drop empty words and 'nan' strings
-            if 'word' in data_to_store:
-                data_to_store = data_to_store[data_to_store['word'].str.lower() != 'nan']
-                data_to_store = data_to_store[data_to_store['word'] != '']
-            
-            # Clean up 'nan' in other metadata columns
-            for col in ['year', 'difficulty', 'list']:
-                if col in data_to_store.columns:
-                    data_to_store[col] = data_to_store[col].replace(['nan', 'None', ''], None)
-            
-            conn = sqlite3.connect(self.db_file)
-            # Recreate table with proper schema
-            conn.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
-            conn.execute(f"""
-                CREATE TABLE {TABLE_NAME} (
-                    word TEXT,
-                    year TEXT,
-                    difficulty TEXT,
-                    list TEXT
-                )
-            """)
-            
-            data_to_store.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
-            conn.close()
-            print(f"Sync complete. Stored {len(data_to_store)} words.")
-            
+            return sync_excel_to_db(excel_path, self.db_file, force=force)
         except Exception as e:
             print(f"Sync error: {e}")
+            return False
 
     def set_filters(self, year=None, list_type=None, difficulty=None):
-        self.filters = {
-            'year': str(year) if year and str(year).lower() != 'all' else None,
-            'list': str(list_type) if list_type and str(list_type).lower() != 'all' else None,
-            'difficulty': str(difficulty) if difficulty and str(difficulty).lower() != 'all' else None
-        }
+        self.filters = normalize_filters(year, list_type, difficulty)
         self.load_words()
 
     def get_filter_metadata(self):
-        """Returns unique values for Year, List, and Difficulty from the DB."""
-        metadata = {'years': [], 'lists': [], 'difficulties': []}
-        try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute(f"SELECT DISTINCT year FROM {TABLE_NAME} WHERE year IS NOT NULL AND year != 'None' AND year != 'nan' ORDER BY year DESC")
-            metadata['years'] = [str(r[0]) for r in cursor.fetchall()]
-            
-            cursor.execute(f"SELECT DISTINCT list FROM {TABLE_NAME} WHERE list IS NOT NULL AND list != 'None' AND list != 'nan' ORDER BY list")
-            metadata['lists'] = [str(r[0]) for r in cursor.fetchall()]
-            
-            cursor.execute(f"SELECT DISTINCT difficulty FROM {TABLE_NAME} WHERE difficulty IS NOT NULL AND difficulty != 'None' AND difficulty != 'nan' ORDER BY difficulty")
-            metadata['difficulties'] = [str(r[0]) for r in cursor.fetchall()]
-            
-            conn.close()
-        except Exception as e:
-            print(f"Metadata error: {e}")
-        return metadata
+        """Returns unique values for Year, List, and Difficulty with word counts per value."""
+        if self.catalog.refresh_if_stale():
+            # Queue positions point into the old catalog
+            self.load_words()
+        return self.catalog.metadata(self.filters)
 
     def set_order(self, order):
         """Sets the word loading order ('random' or 'alphabetical')."""
         self.order = order
         self.load_words()
 
-    def get_context(self, word):
+    def get_context(self, word, on_field=None):
+        """Returns meaning/origin/sentence for a word, served from the context cache when possible.
+
+        On a miss the completion is streamed and on_field(key, value) is called
+        for each field as soon as it has arrived.
+        """
+        # If the prefetcher is already fetching this word, wait for it instead of asking twice
+        self.prefetcher.wait(word)
+        details, hit = self._cached_context(word, on_field)
+        self.prefetcher.record(hit)
+        return details
+
+    def _cached_context(self, word, on_field=None):
+        """Returns (details, was_cached) for a word, fetching and caching it on a miss."""
+        status, details = self.context_cache.lookup(word)
+        if status == 'hit':
+            return details, True
+        if status == 'negative':
+            return dict(FALLBACK_CONTEXT), True
+
         if not self.client:
-            return {"meaning": "Groq API key not configured.", "origin": "N/A", "sentence": "N/A"}
-            
+            return {"meaning": "Groq API key not configured.", "origin": "N/A", "sentence": "N/A"}, False
+
+        details = self._fetch_context(word, on_field)
+        if not details:
+            self.context_cache.put_failure(word)
+            return dict(FALLBACK_CONTEXT), False
+        if len(details) < len(CONTEXT_SCHEMA):
+            # Keep the fields we got; the word is fetched again next time rather than cached incomplete
+            return {**FALLBACK_CONTEXT, **details}, False
+        self.context_cache.put(word, details)
+        return details, False
+
+    def _fetch_context(self, word, on_field=None):
+        """Streams the word context from Groq.
+
+        Returns the valid fields (all three when the answer was complete), or
+        None if the call failed or nothing usable came back.
+        """
         try:
             prompt = f"Provide the definition, origin/root, and one example sentence for the word '{word}'. " \
                      f"Mask the word '{word}' in the definition and example sentence with '***'. " \
                      f"Return the response ONLY as a JSON object with the following keys: 'meaning', 'origin', 'sentence'. " \
                      f"Do not include any other text or markdown formatting."
             
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model="llama-3.3-70b-versatile",
+            parser = StreamingJSONParser()
+            def on_delta(text):
+                for key, value in parser.feed(text):
+                    if on_field and key in CONTEXT_SCHEMA and isinstance(value, str) and value.strip():
+                        on_field(key, value.strip())
+
+            content = self.client.stream(
+                [{"role": "user", "content": prompt}],
+                CONTEXT_MODEL,
+                on_delta,
+                deadline=CONTEXT_DEADLINE,
             )
-            content = chat_completion.choices[0].message.content.strip()
-            
-            # Simple JSON parsing (removing possible markdown blocks if any)
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
             
-            import json
-            details = json.loads(content)
-            return {
-                "meaning": details.get("meaning", "No definition available."),
-                "origin": details.get("origin", "Origin unknown."),
-                "sentence": details.get("sentence", "No example sentence available.")
-            }
+            # Tolerates fences, surrounding prose and truncation; keeps whichever fields are valid
+            details, errors = validate(extract_json(content), CONTEXT_SCHEMA)
+            if errors:
+                print(f"Context for '{word}' incomplete, missing: {', '.join(errors)}")
+            return details or None
                         
         except Exception as e:
             print(f"Groq API Error: {e}")
             
-        return {"meaning": "No definition available.", "origin": "Origin unknown.", "sentence": "No example sentence available."}
+        return None
+
+    def get_contexts(self, words, batch_size=CONTEXT_BATCH_SIZE, retries=CONTEXT_BATCH_RETRIES, progress=None):
+        """Returns {word: details} for many words, fetching cache misses in bulk requests.
+
+        Words missing or malformed in a response are retried in smaller
+        batches; words that still fail are cached as failures and get the
+        fallback context. `progress(done, total)` is called after each batch.
+        """
+        results = {}
+        missing = []
+        for word in dict.fromkeys(words):
+            status, details = self.context_cache.lookup(word)
+            if status == 'hit':
+                results[word] = details
+            elif status == 'negative':
+                results[word] = dict(FALLBACK_CONTEXT)
+            else:
+                missing.append(word)
+
+        total = len(results) + len(missing)
+        if missing and not self.client:
+            print("Warning: GROQ_API_KEY not configured, cannot fetch context.")
+            return results
+
+        for attempt in range(retries + 1):
+            if not missing:
+                break
+            failed = []
+            # All batches go out at once; the LLM client's concurrency cap decides how many run
+            batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+            pending = [(batch, self._submit_context_batch(batch)) for batch in batches]
+            for batch, future in pending:
+                fetched = self._parse_context_batch(batch, future)
+                self.context_cache.put_many(fetched)
+                results.update(fetched)
+                failed.extend(word for word in batch if word not in fetched)
+                if progress:
+                    progress(len(results), total)
+            missing = failed
+            batch_size = max(1, batch_size // 2)
+
+        if missing:
+            self.context_cache.put_many({word: None for word in missing})
+            for word in missing:
+                results[word] = dict(FALLBACK_CONTEXT)
+        return results
+
+    def _submit_context_batch(self, words):
+        """Starts one bulk context request for several words. Returns a future for the response text."""
+        prompt = f"For each word in the list below, provide the definition, origin/root, and one example sentence. " \
+                 f"In each definition and example sentence, mask the word itself with '***'. " \
+                 f"Return the response ONLY as a JSON object whose keys are the words exactly as given and whose values " \
+                 f"are objects with the keys 'meaning', 'origin', 'sentence'. " \
+                 f"Do not include any other text or markdown formatting.\n" \
+                 f"Words: {json.dumps(list(words))}"
+        return self.client.submit(
+            [{"role": "user", "content": prompt}],
+            CONTEXT_MODEL,
+            deadline=CONTEXT_BATCH_DEADLINE,
+            response_format={"type": "json_object"},
+        )
+
+    def _parse_context_batch(self, words, future):
+        """Returns {word: details} for the words that came back complete; absent words failed."""
+        try:
+            data = extract_json(future.result())
+        except Exception as e:
+            print(f"Groq API Error ({len(words)} words): {e}")
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+        # Match keys loosely: the model may change case or spacing
+        by_key = {normalize_word(word): word for word in words}
+        results = {}
+        for key, details in data.items():
+            word = by_key.get(normalize_word(key))
+            details, errors = validate(details, CONTEXT_SCHEMA)
+            if word is not None and not errors:
+                results[word] = details
+        return results
+
+    def build_queue(self, filters, order, persist_key=None):
+        """Builds a WordQueue over the shared catalog; resumes saved state when persist_key is given."""
+        # The catalog only reloads when the sync manifest changed
+        self.catalog.refresh_if_stale()
+        positions = self.catalog.select(filters)
+        shuffle = order != 'alphabetical'
+        if not shuffle:
+            positions.sort(key=self.catalog.words.__getitem__)
+
+        # Resume where this filter/order combination left off, if the catalog is unchanged
+        state = None
+        if persist_key:
+            state = load_queue_state(self.db_file, persist_key, str(self.catalog.signature))
+        word_queue = WordQueue(positions, shuffle=shuffle, **(state or {}))
+        # Positions are only meaningful for the catalog they were taken from
+        word_queue.signature = self.catalog.signature
+        return word_queue
+
+    def serve_next(self, word_queue, owner=None, persist_key=None):
+        """Advances a queue and starts prefetching the words after it. Returns the word or None."""
+        position = word_queue.next()
+        if position is None:
+            return None
+        word = self.catalog.words[position]
+        if persist_key:
+            save_queue_state(self.db_file, persist_key, str(self.catalog.signature), word_queue)
+        # Warm the context for the words that will be served next
+        self.prefetcher.schedule(self.peek_words(word_queue), owner=owner)
+        return word
+
+    def peek_words(self, word_queue=None, count=None):
+        """Returns the next `count` words of a queue (default: this game's) without consuming them."""
+        if word_queue is None:
+            word_queue = self.queue
+        if count is None:
+            count = self.prefetcher.depth
+        words = self.catalog.words
+        return [words[p] for p in word_queue.peek(count)]
 
     def load_words(self):
+        # Anything queued for the previous order is no longer useful
+        self.prefetcher.cancel()
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            query = f"SELECT word FROM {TABLE_NAME} WHERE 1=1"
-            params = []
-            
-            if self.filters['year']:
-                query += " AND year = ?"
-                params.append(self.filters['year'])
-            if self.filters['list']:
-                query += " AND list = ?"
-                params.append(self.filters['list'])
-            if self.filters['difficulty']:
-                query += " AND difficulty = ?"
-                params.append(self.filters['difficulty'])
-                
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            conn.close()
-            
-            if rows:
-                all_words = [str(row[0]).strip().replace('**', '').replace('  ', ' ').strip() for row in rows if row[0]]
-                self.words = [w for w in all_words if w and w.lower() != 'nan']
-                
-                if self.order == 'alphabetical':
-                    self.words.sort()
-                else:
-                    random.shuffle(self.words)
-                print(f"Loaded {len(self.words)} words with filters: {self.filters}")
+            self.queue = self.build_queue(self.filters, self.order, self._queue_key())
+            if len(self.queue):
+                print(f"Loaded {len(self.queue)} words with filters: {self.filters}")
+                self.prefetcher.schedule(self.peek_words())
+                self.prerender_speech()
             else:
-                self.words = []
                 print(f"No words found matching filters: {self.filters}")
                  
         except Exception as e:
-            print(f"Database error: {e}")
+            print(f"Catalog error: {e}")
+
+    def _queue_key(self):
+        return json.dumps({'filters': self.filters, 'order': self.order}, sort_keys=True)
 
     def get_next_word(self):
-        if not self.words:
-            return None
-        self.current_word = self.words.pop(0)
-        # Put it back at the end? or just consume? consuming for now.
-        self.words.append(self.current_word) 
+        self.current_word = self.serve_next(self.queue, persist_key=self._queue_key())
         return self.current_word
 
+    def prerender_speech(self, word_queue=None, owner=None):
+        """Renders the fixed phrases and the prompts of a queue's next PRERENDER_AHEAD words in the background."""
+        if self.tts is None:
+            return
+        self.tts.prerender_async(self.peek_words(word_queue, PRERENDER_AHEAD), owner=owner)
+
+    def spelling_index(self):
+        """Near-miss index over the whole word bank, rebuilt when the catalog changes."""
+        with self._spelling_index_lock:
+            if self._spelling_index is None or self._spelling_index[0] != self.catalog.signature:
+                self._spelling_index = (self.catalog.signature, SpellingIndex(self.catalog.words))
+            return self._spelling_index[1]
+
+    def interpret_answer(self, transcript, target_word):
+        """Reads the spelling out of a transcript (letter names, homophones, fillers) and finds near misses."""
+        return interpret(transcript, target_word, self.spelling_index())
+
     def speak(self, text):
         print(f"Agent: {text}")
-        safe_text = text.replace("'", "''")
-        command = f"Add-Type -AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak('{safe_text}');"
-        subprocess.run(["powershell", "-Command", command], shell=False)
+        if self.tts is None:
+            return
+        try:
+            with self.audio_lock:
+                self.tts.speak(text)
+        except Exception as e:
+            print(f"TTS Error: {e}")
 
-    def listen_and_recognize(self, duration=DURATION):
-        recognizer = sr.Recognizer()
+    def listen_and_recognize(self, duration=DURATION, cancel_event=None, expected_words=None, on_captured=None):
+        """Records until silence (or `duration`) and returns the transcript, or None.
+
+        Setting `cancel_event` stops the capture early and returns None.
+        `expected_words` (the word being spelled) lets constrained backends bias towards it.
+        `on_captured` is called once the microphone is closed, before recognition starts.
+        """
         print(f"Listening (Gapless, max {duration}s)...")
         
+        # Samples land directly in one preallocated buffer sized for the whole window;
+        # the queue only carries (start, end) offsets of each new block
+        buffer = np.empty(int(SAMPLE_RATE * duration) + SAMPLE_RATE, dtype=np.int16)
+        filled = [0]
         q = queue.Queue()
         def callback(indata, frames, time_info, status):
             if status: print(f"Audio Status: {status}")
-            q.put(indata.copy())
+            start = filled[0]
+            count = min(frames, len(buffer) - start)
+            if count <= 0:
+                return
+            buffer[start:start + count] = indata[:count, 0]
+            filled[0] = start + count
+            q.put((start, start + count))
 
-        audio_data = []
-        silence_threshold = 80
-        required_silence_duration = 2.0  # seconds of silence to trigger stop
+        vad = self.vad_factory(SAMPLE_RATE)
         max_duration = duration
-        
-        has_started_speaking = False
-        silence_duration = 0
         start_time = time.time()
 
         try:
-            with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16', callback=callback):
-                while time.time() - start_time < max_duration:
-                    try:
-                        # Get data from queue with short timeout to stay responsive
-                        chunk = q.get(timeout=0.1)
-                        audio_data.append(chunk)
-                        
-                        volume = np.abs(chunk).mean()
-                        if volume > silence_threshold:
-                            if not has_started_speaking:
+            try:
+                with self.audio_lock, self.audio_source(SAMPLE_RATE, callback):
+                    while time.time() - start_time < max_duration:
+                        if cancel_event is not None and cancel_event.is_set():
+                            print("Listening cancelled.")
+                            return None
+                        try:
+                            # Get data from queue with short timeout to stay responsive
+                            start, end = q.get(timeout=0.1)
+                            had_started = vad.speech_started
+                            ended = vad.process(buffer[start:end])
+                            if vad.speech_started and not had_started:
                                 print("Debug - Speech detected!")
-                                has_started_speaking = True
-                            silence_duration = 0
-                        else:
-                            if has_started_speaking:
-                                # Calculate time based on chunk size
-                                silence_duration += len(chunk) / SAMPLE_RATE
-                        
-                        if has_started_speaking and silence_duration >= required_silence_duration:
-                            print("Silence detected, stopping recording.")
-                            break
-                    except queue.Empty:
-                        continue
+                            if ended:
+                                print("Silence detected, stopping recording.")
+                                break
+                        except queue.Empty:
+                            continue
+            finally:
+                if on_captured is not None:
+                    on_captured()
             
-            if not audio_data: 
+            if not filled[0]: 
                 return None
                 
-            # Combine chunks and save
-            full_audio = np.concatenate(audio_data, axis=0)
-            wav.write(TEMP_WAV, SAMPLE_RATE, full_audio)
-            
-            # Recognize using AudioFile
-            with sr.AudioFile(TEMP_WAV) as source:
-                audio = recognizer.record(source)
-                try:
-                    text = recognizer.recognize_google(audio)
-                    return text
-                except sr.UnknownValueError:
-                    return None
+            # Hand the recorded samples to the recognizer without a temp file
+            audio = to_audio_data(buffer[:filled[0]], SAMPLE_RATE)
+            return self.recognizer.recognize(audio, expected_words=expected_words)
         except Exception as e:
             print(f"Gapless Listen Error: {e}")
             return None
-        finally:
-            if os.path.exists(TEMP_WAV):
-                try: 
-                    os.remove(TEMP_WAV)
-                except: pass
 
     def check_spelling(self, user_input, target_word):
         if not user_input: return False
-        clean_input = user_input.replace(" ", "").lower()
-        clean_target = target_word.lower().replace(" ", "")
-        
-        is_correct = (clean_input == clean_target)
+        is_correct = spelling_matches(user_input, target_word)
         if is_correct:
             self.score['correct'] += 1
         else:
@@ -326,7 +468,7 @@ def main():
         user_text = game.listen_and_recognize()
         if user_text:
             game.speak(f"You said: {user_text}")
-            if game.check_spelling(user_text, word):
+            if game.check_spelling(game.interpret_answer(user_text, word)['spelling'], word):
                 game.speak(f"Correct! The word is {word}.")
             else:
                 game.speak(f"Incorrect. The word is {word}.")
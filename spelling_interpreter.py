@@ -0,0 +1,298 @@
+"""Reads the letters out of a spoken-spelling transcript.
+
+Speech recognizers rarely return "b e e" for a spelled word: letters come
+back as their names ("bee", "see", "why"), as homophones ("sea", "tea",
+"you"), run together ("ab c") or with fillers around them. interpret()
+strips the target word and fillers from the ends, maps every token through
+a precomputed letter-name table, and checks whether any reading of the
+tokens spells the target. A token reads as a letter only through its
+letter name; a literal chunk is accepted only when it is a short run of
+run-together letters ("ab") or of letter names ("beesee"), so words said
+whole ("pine apple", "can not") never pass for a spelling.
+
+For a wrong answer, SpellingIndex finds the word-bank words within a small
+edit distance using a deletion-neighbourhood index: one dictionary lookup
+per single-character deletion of the attempt, so a lookup costs O(len)
+probes whatever the size of the word bank, and each candidate is verified
+with a banded edit distance.
+"""
+import re
+from collections import defaultdict
+
+from word_sync import spelling_key
+
+# Configuration
+MAX_RUN = 3                 # longest chunk of run-together single letters read literally ("rig a t o n i")
+INDEX_DISTANCE = 1          # edits covered by the deletion index (each extra edit multiplies its size)
+NEAR_MISS_DISTANCE = 2      # answers this close to the target are reported as near misses
+MAX_NEAR_WORDS = 5          # other words listed for a near miss
+
+# Letter names and the words recognizers hear instead of them
+LETTER_NAMES = {
+    'a': ['a', 'ay', 'eh', 'hey'],
+    'b': ['b', 'be', 'bee', 'bea'],
+    'c': ['c', 'see', 'sea', 'cee', 'si'],
+    'd': ['d', 'dee', 'de', 'the'],
+    'e': ['e', 'ee', 'ea'],
+    'f': ['f', 'ef', 'eff', 'if'],
+    'g': ['g', 'gee', 'ji', 'jee'],
+    'h': ['h', 'aitch', 'haitch', 'ache', 'age'],
+    'i': ['i', 'eye', 'aye', "i'", 'ai'],
+    'j': ['j', 'jay', 'jae'],
+    'k': ['k', 'kay', 'cay', 'ok', 'okay', 'que'],
+    'l': ['l', 'el', 'ell', 'elle', 'al'],
+    'm': ['m', 'em', 'emm', 'im', 'um'],
+    'n': ['n', 'en', 'in', 'and', 'an'],
+    'o': ['o', 'oh', 'owe', 'ow'],
+    'p': ['p', 'pee', 'pea', 'pe'],
+    'q': ['q', 'cue', 'queue', 'kew', 'kyu'],
+    'r': ['r', 'are', 'ar', 'our', 'arr'],
+    's': ['s', 'es', 'ess', 'as', 'is', 'yes'],
+    't': ['t', 'tee', 'tea', 'ti', 'te', 'to', 'two'],
+    'u': ['u', 'you', 'yu', 'ewe', 'yew'],
+    'v': ['v', 'vee', 've', 'vi'],
+    'w': ['w', 'doubleyou', 'doubleu', 'dublu'],
+    'x': ['x', 'ex', 'eks', 'ax'],
+    'y': ['y', 'why', 'wye', 'wi'],
+    'z': ['z', 'zee', 'zed', 'zedd', 'zea'],
+}
+LETTER_TABLE = {name: letter for letter, names in LETTER_NAMES.items() for name in names}
+REPEATS = {'double': 2, 'triple': 3}
+# Skipped anywhere in the spelling
+FILLERS = {'um', 'uh', 'uhm', 'er', 'erm', 'hmm', 'mm', 'capital', 'letter', 'lowercase', 'uppercase'}
+# Skipped only before the first or after the last letter ("the word is ... that's it")
+BOUNDARY_WORDS = {'the', 'word', 'is', 'its', "it's", 'spelled', 'spell', 'spelling', 'okay', 'ok', 'so',
+                  'and', 'that', "that's", 'thats', 'it', 'please'}
+TOKEN_RE = re.compile(r"[a-z']+")
+# Letter names long enough to be recognized inside a run ("beesee" -> bc)
+RUN_NAMES = {name: letter for name, letter in LETTER_TABLE.items() if len(name) > 1 and "'" not in name}
+
+
+def tokenize(text):
+    """Lowercase word tokens; dots, dashes and commas between letters ("b-e-e", "b.e.e.") separate them."""
+    return [token.strip("'") for token in TOKEN_RE.findall(str(text).lower()) if token.strip("'")]
+
+
+def bounded_distance(a, b, max_distance):
+    """Optimal-string-alignment distance (Levenshtein plus adjacent transpositions) between a and b.
+
+    Only a diagonal band of width 2 * max_distance + 1 is computed, and the
+    scan stops as soon as every cell in a row exceeds max_distance; anything
+    beyond the bound is returned as max_distance + 1.
+    """
+    if a == b:
+        return 0
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    if len(a) > len(b):
+        a, b = b, a
+    rows, cols = len(a), len(b)
+    before = None
+    previous = [j if j <= max_distance else too_far for j in range(cols + 1)]
+    for i in range(1, rows + 1):
+        current = [too_far] * (cols + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_best = current[0]
+        for j in range(max(1, i - max_distance), min(cols, i + max_distance) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = min(value, too_far)
+            row_best = min(row_best, current[j])
+        if row_best > max_distance:
+            return too_far
+        before, previous = previous, current
+    return previous[cols]
+
+
+def deletions(key, depth):
+    """key plus every string made by deleting up to `depth` characters from it."""
+    variants = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+class SpellingIndex:
+    """Deletion-neighbourhood index over the spelling keys of a word list."""
+
+    def __init__(self, words, max_distance=INDEX_DISTANCE):
+        self.max_distance = max_distance
+        self.words = defaultdict(list)          # spelling key -> display words
+        for word in words:
+            self.words[spelling_key(word)].append(word)
+        self._neighbours = defaultdict(list)    # deletion variant -> spelling keys
+        for key in self.words:
+            for variant in deletions(key, max_distance):
+                self._neighbours[variant].append(key)
+
+    def __len__(self):
+        return len(self.words)
+
+    def exact(self, attempt):
+        """Words spelled exactly like attempt."""
+        return list(self.words.get(attempt, ()))
+
+    def near(self, attempt, max_distance=None):
+        """(word, distance) pairs within max_distance of attempt, closest first.
+
+        Distances up to the index depth are found exhaustively; a larger
+        max_distance only widens the verification of the same candidates.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        candidates = set()
+        for variant in deletions(attempt, self.max_distance):
+            candidates.update(self._neighbours.get(variant, ()))
+        found = []
+        for key in candidates:
+            distance = bounded_distance(attempt, key, max_distance)
+            if distance <= max_distance:
+                found.extend((word, distance) for word in self.words[key])
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
+
+
+def split_answer(tokens, target_word):
+    """Marks the tokens around the spelling that may not be part of it.
+
+    Returns (token, optional) pairs. Whole words (the target, a mis-hearing
+    of it, a homophone) and boundary words ("the word is", "that's it") said
+    before or after the letters are optional: they are usually not spelled
+    letters, but some are ("bee" for B, "the" for D, "you" for U) and some
+    are letters run together ("app l e").
+    """
+    target_tokens = tokenize(target_word)
+    target = spelling_key(target_word)
+    tolerance = 1 if len(target) <= 6 else 2
+
+    def is_edge(token):
+        if token in BOUNDARY_WORDS or token == target or token in target_tokens:
+            return True
+        # Whole words ("their" before t-h-e-r-e) and mis-hearings of the target, including letter names
+        return len(token) >= 3 and (token not in LETTER_TABLE
+                                    or bounded_distance(token, target, tolerance) <= tolerance)
+
+    optional = set()
+    for indices in (range(len(tokens)), range(len(tokens) - 1, -1, -1)):
+        for i in indices:
+            if not is_edge(tokens[i]):
+                break
+            optional.add(i)
+    return [(token, i in optional) for i, token in enumerate(tokens)]
+
+
+def letter_runs(token):
+    """Letter strings a token not in the letter table may stand for.
+
+    A short run of single letters reads as itself ("ab" -> ab); a longer
+    token only as a run of letter names ("beesee" -> bc). Anything else is
+    a word and reads as no letters at all.
+    """
+    runs = {token} if len(token) <= MAX_RUN else set()
+    partial = {0: {''}}
+    for end in range(1, len(token) + 1):
+        for start in range(max(0, end - 8), end - 1):
+            letter = RUN_NAMES.get(token[start:end])
+            if letter and start in partial:
+                partial.setdefault(end, set()).update(prefix + letter for prefix in partial[start])
+    return runs | partial.get(len(token), set())
+
+
+def spelling_units(answer):
+    """Groups (token, optional) pairs into units, each with its readings.
+
+    Returns (primary, readings, spelled) per unit: primary is the letter
+    reading ('' for fillers and optional tokens), readings every
+    string the unit may stand for ('' included when it may be skipped),
+    and spelled whether the unit is a letter said by name.
+    """
+    units = []
+    n = 0
+    while n < len(answer):
+        token, optional = answer[n]
+        if token in FILLERS:
+            # "um" is also how M gets transcribed
+            units.append(('', {'', LETTER_TABLE.get(token, '')}, False))
+        elif token in REPEATS and n + 1 < len(answer):
+            following = answer[n + 1][0]
+            letter = LETTER_TABLE.get(following, following)
+            if token == 'double' and following in ('you', 'u'):
+                units.append(('w', {'w'}, True))
+            else:
+                units.append((letter * REPEATS[token], {letter * REPEATS[token]}, following in LETTER_TABLE))
+            n += 1
+        elif token in LETTER_TABLE:
+            letter = LETTER_TABLE[token]
+            units.append(('' if optional else letter, {letter} | ({''} if optional else set()), not optional))
+        else:
+            # A word inside the spelling is kept as heard but can never be part of a correct reading
+            runs = letter_runs(token)
+            primary = '' if optional else min(runs, key=len, default=token)
+            units.append((primary, runs | ({''} if optional else set()), False))
+        n += 1
+    return units
+
+
+def read_letters(units):
+    """The plain letter reading of the units."""
+    return "".join(primary for primary, _, _ in units)
+
+
+def can_spell(units, target):
+    """Whether some choice of one reading per unit spells exactly target (DP over target positions)."""
+    if not any(spelled for _, _, spelled in units):
+        # Words and runs alone are the word said aloud, not spelled
+        return False
+    reachable = {0}
+    for _, readings, _ in units:
+        reachable = {position + len(reading) for position in reachable for reading in readings
+                     if target.startswith(reading, position)}
+        if not reachable:
+            return False
+    return len(target) in reachable
+
+
+def interpret(transcript, target_word, index=None):
+    """Interprets a spelling answer for target_word.
+
+    Returns a dict with the `spelling` to grade (the target's spelling key
+    when some reading of the answer spells it, otherwise the letter
+    reading; empty when only the word itself was said, whole or in
+    pieces), the spelled
+    `tokens`, `correct`, the `distance` to the target (capped at
+    NEAR_MISS_DISTANCE + 1), `near_miss`, and with an index also `spells`
+    (other words spelled exactly that way) and `near_words`.
+    """
+    target = spelling_key(target_word)
+    answer = split_answer(tokenize(transcript), target_word)
+    units = spelling_units(answer)
+    letters = read_letters(units)
+    if not letters:
+        # No letters, only words: a mis-heard form of the target counts as the attempt, the target itself does not
+        letters = "".join(token for token, _ in answer
+                          if token not in BOUNDARY_WORDS and token not in FILLERS and token != target
+                          and token not in tokenize(target_word))
+    correct = bool(letters) and can_spell(units, target)
+    if not correct and letters == target:
+        # The target said whole or in pieces ("pine apple"), not spelled
+        letters = ''
+    spelling = target if correct else letters
+    distance = 0 if correct else bounded_distance(letters, target, NEAR_MISS_DISTANCE)
+    result = {
+        'spelling': spelling,
+        'tokens': [token for token, optional in answer if not optional] or ([letters] if letters else []),
+        'correct': correct,
+        'distance': distance,
+        'near_miss': 0 < distance <= NEAR_MISS_DISTANCE,
+    }
+    if index is not None and not correct and letters:
+        result['spells'] = [word for word in index.exact(letters) if spelling_key(word) != target]
+        result['near_words'] = [word for word, distance in index.near(letters)
+                                if distance and spelling_key(word) != target][:MAX_NEAR_WORDS]
+    return result
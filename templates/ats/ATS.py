@@ -1,43 +1,120 @@
 import os
+import io
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import PyPDF2 as pdf
-import requests
-from bs4 import BeautifulSoup
-from flask import Flask, request, render_template, jsonify
-from groq import Groq
+from flask import Flask, Request, request, render_template, jsonify
 from dotenv import load_dotenv
 
+# Run from the repository root (python -m templates.ats.ATS) so the shared LLM client is importable
+from llm_client import get_llm_client
+from llm_json import extract_json, validate
+from .scraper import Scraper
+from .analysis_cache import AnalysisCache, analysis_key, sha256
+from .prescreen import prescreen, TOP_K
+
 load_dotenv()
 
-# Configure Groq
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+MODEL = "llama-3.3-70b-versatile" # High performance Llama model
+ANALYSIS_DEADLINE = 60 # seconds per resume, retries included
+# JD pages: shared keep-alive session and ETag/Last-Modified disk cache (SCRAPE_CACHE_DIR)
+scraper = Scraper()
+# Extracted text per PDF hash and analyses per (resume, JD, prompt version, model) (ATS_CACHE_DB)
+analysis_cache = AnalysisCache()
+# Expected analysis fields; defaults fill in anything a truncated response lost
+ANALYSIS_SCHEMA = {
+    "JD Match": (str, "0%"),
+    "MissingKeywords": (list, []),
+    "Profile Summary": (str, ""),
+    "SkillsMatching": (list, []),
+}
+# Batch analysis: PDF parsing runs in worker processes, LLM calls fan out on the shared client
+EXTRACT_WORKERS = int(os.getenv("ATS_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PARALLEL = int(os.getenv("ATS_MAX_PARALLEL", "8")) # LLM calls in flight per /analyze request
+# Uploads stay in memory (see InMemoryRequest) and are never written to disk
+MAX_FILE_BYTES = int(os.getenv("ATS_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+MAX_FILES = int(os.getenv("ATS_MAX_FILES", "50")) # resumes per request; bounds the request size below
+FORM_BYTES = 1024 * 1024 # allowance for the JD and other form fields
+MAX_PAGES = int(os.getenv("ATS_MAX_PAGES", "30")) # pages read per resume; the rest is ignored
+PAGES_PER_TASK = 8 # longer PDFs are split into page ranges extracted in parallel
+COPY_CHUNK = 64 * 1024
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+class InMemoryRequest(Request):
+    """Keeps uploaded file parts in memory; Werkzeug would spool parts over 500 KB to a temp file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.request_class = InMemoryRequest
+# Reject oversized requests before Werkzeug buffers them; the per-file cap is checked while reading
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_BYTES * MAX_FILES + FORM_BYTES
 
-def get_groq_response(resume_text, jd, prompt_template):
+@app.errorhandler(413)
+def request_too_large(_):
+    limit = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({"error": f"Upload is larger than {limit} MB (at most {MAX_FILES} files of "
+                             f"{MAX_FILE_BYTES // (1024 * 1024)} MB)"}), 413
+
+def build_messages(resume_text, jd, prompt_template):
     # Combine the prompt with the data
     full_prompt = prompt_template.format(text=resume_text, jd=jd)
-    
-    chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": full_prompt,
-            }
-        ],
-        model="llama-3.3-70b-versatile", # High performance Llama model
-    )
-    return chat_completion.choices[0].message.content
-
-def input_pdf_text(uploaded_file):
+    return [
+        {
+            "role": "user",
+            "content": full_prompt,
+        }
+    ]
+
+def get_client():
+    """Shared Groq client (pooled connections, per-call deadline, retries and a concurrency cap).
+
+    Created on first use, so the PDF worker processes, which import this module, never build one.
+    """
+    return get_llm_client()
+
+def get_groq_response(resume_text, jd, prompt_template):
+    return get_client().chat(build_messages(resume_text, jd, prompt_template), MODEL, deadline=ANALYSIS_DEADLINE)
+
+def submit_groq_request(resume_text, jd, prompt_template):
+    """Starts the analysis call without blocking; returns a future for the response text."""
+    return get_client().submit(build_messages(resume_text, jd, prompt_template), MODEL, deadline=ANALYSIS_DEADLINE)
+
+def parse_analysis(response_text):
+    """Turns the model's answer into the analysis dict; raises ValueError if it holds no JSON object."""
+    data = extract_json(response_text)
+    if not isinstance(data, dict):
+        raise ValueError("Analysis is not a JSON object")
+    analysis, _ = validate(data, ANALYSIS_SCHEMA)
+    return analysis
+
+def input_pdf_text(uploaded_file, start=0, stop=MAX_PAGES):
     reader = pdf.PdfReader(uploaded_file)
-    text = ""
-    for page in range(len(reader.pages)):
+    stop = min(stop, len(reader.pages))
+    # Collect page texts and join once; += would copy the growing string on every page
+    parts = []
+    for page in range(start, stop):
         page_obj = reader.pages[page]
-        text += str(page_obj.extract_text())
-    return text
+        parts.append(str(page_obj.extract_text()))
+    return "".join(parts)
+
+def read_upload(uploaded_file, max_bytes=MAX_FILE_BYTES):
+    """Reads an upload into memory; raises ValueError above max_bytes."""
+    data = bytearray()
+    while True:
+        chunk = uploaded_file.stream.read(COPY_CHUNK)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_bytes:
+            raise ValueError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+        data += chunk
+    return bytes(data)
+
+def page_count(data):
+    return len(pdf.PdfReader(io.BytesIO(data)).pages)
 
 # Prompt Template
 input_prompt = """
@@ -64,6 +141,8 @@ The structure must be:
   ]
 }}
 """
+# Cached analyses are only reused while the prompt and expected fields are unchanged
+PROMPT_VERSION = sha256(input_prompt + repr(sorted(ANALYSIS_SCHEMA)))[:12]
 
 @app.route('/')
 def index():
@@ -76,28 +155,222 @@ def scrape():
         return jsonify({"error": "No URL provided"}), 400
     
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.extract()
-            
-        # Get text
-        text = soup.get_text()
-        
-        # Breakdown into lines and remove leading/trailing whitespace
-        lines = (line.strip() for line in text.splitlines())
-        # Break multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        # Drop blank lines
-        clean_text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        return jsonify({"text": clean_text[:5000]}) # Limit to roughly 5000 chars for prompt safety
+        # Pooled session + on-disk page cache; a repeat URL is served or revalidated instead of re-downloaded
+        text, source = scraper.scrape(url)
+        return jsonify({"text": text, "source": source})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def extract_pool():
+    """Process pool for PDF parsing (CPU-bound, so threads would serialize on the GIL)."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+        return _extract_pool
+
+def extract_pdf_pages(data, start, stop):
+    """Runs in a worker process: text of pages [start, stop) of a PDF held in memory. Returns (text, seconds)."""
+    began = time.perf_counter()
+    text = input_pdf_text(io.BytesIO(data), start, stop)
+    return text, time.perf_counter() - began
+
+def page_ranges(pages, max_pages=MAX_PAGES, per_task=PAGES_PER_TASK):
+    pages = min(pages, max_pages)
+    return [(start, min(start + per_task, pages)) for start in range(0, max(pages, 1), per_task)]
+
+def extract_batch(files, use_cache=True, on_text=None):
+    """Extracts the text of (filename, pdf bytes) pairs in the process pool.
+
+    Returns one dict per file, in upload order, with "text" or "error", a
+    "timing" dict and "cached" (whether the text came from the cache).
+    on_text(i, text) is called as soon as file i's text is ready.
+    """
+    extracted = [{"text": None, "error": None, "timing": {}, "cached": False} for _ in files]
+    pool = extract_pool()
+    extract_futures = {}
+    chunks = {}
+    pdf_hashes = {}
+    for i, (filename, data) in enumerate(files):
+        timing = extracted[i]["timing"]
+        pdf_hashes[i] = sha256(data)
+        entry = analysis_cache.get_text(pdf_hashes[i], MAX_PAGES) if use_cache else None
+        if entry is not None:
+            extracted[i]["cached"] = True
+            extracted[i]["text"] = entry["text"]
+            timing["pages"] = entry["pages"]
+            if entry.get("pages_skipped"):
+                timing["pages_skipped"] = entry["pages_skipped"]
+            timing["extract_seconds"] = 0.0
+            if on_text:
+                on_text(i, entry["text"])
+            continue
+        try:
+            pages = page_count(data)
+        except Exception as e:
+            extracted[i]["error"] = f"Could not read PDF: {e}"
+            continue
+        ranges = page_ranges(pages)
+        chunks[i] = [None] * len(ranges)
+        timing["pages"] = ranges[-1][1]
+        if pages > MAX_PAGES:
+            timing["pages_skipped"] = pages - MAX_PAGES
+        for n, (start, stop) in enumerate(ranges):
+            extract_futures[pool.submit(extract_pdf_pages, data, start, stop)] = (i, n)
+
+    for future in as_completed(extract_futures):
+        i, n = extract_futures[future]
+        if extracted[i]["error"] is not None:
+            continue # another page range of this file already failed
+        try:
+            chunks[i][n] = future.result()
+        except Exception as e:
+            extracted[i]["error"] = f"Could not read PDF: {e}"
+            continue
+        if any(chunk is None for chunk in chunks[i]):
+            continue
+        text = extracted[i]["text"] = "".join(chunk[0] for chunk in chunks[i])
+        timing = extracted[i]["timing"]
+        timing["extract_seconds"] = round(sum(chunk[1] for chunk in chunks[i]), 3)
+        analysis_cache.put_text(pdf_hashes[i], MAX_PAGES, {
+            "text": text,
+            "pages": timing["pages"],
+            "pages_skipped": timing.get("pages_skipped", 0),
+        })
+        if on_text:
+            on_text(i, text)
+    return extracted
+
+def rank_batch(files, extracted, jd, top_k=TOP_K):
+    """TF-IDF pre-screen of every extracted resume; returns (prescreen dicts by file index, seconds)."""
+    began = time.perf_counter()
+    readable = [i for i, entry in enumerate(extracted) if entry["text"] is not None]
+    ranked = prescreen(jd, [extracted[i]["text"] for i in readable], top_k)
+    return dict(zip(readable, ranked)), round(time.perf_counter() - began, 3)
+
+def shortlist_order(files, screened):
+    """Filenames of the pre-screened files, best match first."""
+    return [{"filename": files[i][0], "rank": entry["rank"], "score": entry["score"],
+             "shortlisted": entry["shortlisted"]}
+            for i, entry in sorted(screened.items(), key=lambda item: item[1]["rank"])]
+
+def analyze_batch(files, jd, max_parallel=MAX_PARALLEL, use_cache=True, top_k=TOP_K):
+    """Analyzes (filename, pdf bytes) pairs concurrently; returns (results, shortlist, timing) in upload order.
+
+    Long PDFs are split into page ranges extracted in parallel. Each file is
+    scored as soon as all of its pages are in, with at most max_parallel LLM
+    calls in flight. One file failing never affects the others. Extracted
+    text and analyses are looked up in the cache first (unless use_cache is
+    False) and stored after; identical resumes in one batch share one call.
+
+    Batches larger than top_k (when top_k > 0) are pre-screened with TF-IDF
+    once all text is in, and only the top_k best matches go to the LLM.
+    """
+    batch_start = time.perf_counter()
+    results = [None] * len(files)
+    cached = [{"text": False, "analysis": False} for _ in files]
+    finished_at = {}
+    gate = threading.BoundedSemaphore(max(1, max_parallel))
+    pending = []
+    in_flight = {}
+
+    def start_analysis(i, text):
+        key = analysis_key(text, jd, PROMPT_VERSION, MODEL)
+        analysis = analysis_cache.get_analysis(key) if use_cache else None
+        if analysis is not None:
+            cached[i]["analysis"] = True
+            results[i] = {"filename": files[i][0], "analysis": analysis}
+            return
+        if key not in in_flight:
+            # Get Groq Analysis (bounded fan-out; the shared client also caps process-wide concurrency)
+            gate.acquire()
+            submitted = time.perf_counter()
+            llm_future = submit_groq_request(text, jd, input_prompt)
+            def done(_, key=key):
+                finished_at[key] = time.perf_counter()
+                gate.release()
+            llm_future.add_done_callback(done)
+            in_flight[key] = (llm_future, submitted)
+        pending.append((i, key))
+
+    # Small batches stream straight to the LLM; large ones wait for the ranking
+    gated = 0 < top_k < len(files)
+    extracted = extract_batch(files, use_cache, on_text=None if gated else start_analysis)
+    timings = [entry["timing"] for entry in extracted]
+    for i, entry in enumerate(extracted):
+        cached[i]["text"] = entry["cached"]
+        if entry["error"] is not None:
+            results[i] = {"filename": files[i][0], "error": entry["error"]}
+    screened, prescreen_seconds = rank_batch(files, extracted, jd, top_k)
+    if gated:
+        for i, entry in sorted(screened.items(), key=lambda item: item[1]["rank"]):
+            if entry["shortlisted"]:
+                start_analysis(i, extracted[i]["text"])
+            else:
+                results[i] = {"filename": files[i][0], "skipped": f"Not in the pre-screen top {top_k}"}
+
+    parsed = {}
+    for i, key in pending:
+        filename = files[i][0]
+        llm_future, submitted = in_flight[key]
+        try:
+            response_text = llm_future.result()
+        except Exception as e:
+            results[i] = {"filename": filename, "error": str(e)}
+            continue
+        timings[i]["llm_seconds"] = round(finished_at[key] - submitted, 3)
+        parse_start = time.perf_counter()
+        try:
+            if key not in parsed:
+                parsed[key] = parse_analysis(response_text)
+                analysis_cache.put_analysis(key, parsed[key])
+            results[i] = {"filename": filename, "analysis": parsed[key]}
+        except ValueError as e:
+            results[i] = {"filename": filename, "error": f"Could not parse analysis: {e}", "raw": response_text}
+        timings[i]["parse_seconds"] = round(time.perf_counter() - parse_start, 3)
+
+    for i, (result, timing, hit) in enumerate(zip(results, timings, cached)):
+        result["timing"] = timing
+        result["cached"] = hit
+        if i in screened:
+            result["prescreen"] = screened[i]
+    timing = {
+        "files": len(files),
+        "max_parallel": max_parallel,
+        "extract_workers": EXTRACT_WORKERS,
+        "total_seconds": round(time.perf_counter() - batch_start, 3),
+        "extract_seconds_sum": round(sum(t.get("extract_seconds", 0) for t in timings), 3),
+        "llm_seconds_sum": round(sum(t.get("llm_seconds", 0) for t in timings), 3),
+        "prescreen_seconds": prescreen_seconds,
+        "top_k": top_k,
+        "text_cache_hits": sum(hit["text"] for hit in cached),
+        "analysis_cache_hits": sum(hit["analysis"] for hit in cached),
+        "llm_calls": len(in_flight),
+    }
+    return results, shortlist_order(files, screened), timing
+
+def read_uploads(uploaded_files):
+    """Reads the uploaded resumes; returns (files, rejected) with rejected keyed by upload position."""
+    files = []
+    rejected = {}
+    for uploaded_file in uploaded_files:
+        if uploaded_file.filename == '':
+            continue
+        try:
+            files.append((uploaded_file.filename, read_upload(uploaded_file)))
+        except ValueError as e:
+            rejected[len(files) + len(rejected)] = {"filename": uploaded_file.filename, "error": str(e), "timing": {},
+                                                    "cached": {"text": False, "analysis": False}}
+    return files, rejected
+
+def int_field(name, default, maximum=None):
+    """Integer form field; raises ValueError with a message for the client."""
+    try:
+        value = int(request.form.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    return min(maximum, value) if maximum is not None else value
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     jd = request.form['jd']
@@ -106,34 +379,57 @@ def analyze():
     if not uploaded_files or not jd:
         return jsonify({"error": "Missing files or JD"}), 400
 
-    results = []
-    for uploaded_file in uploaded_files:
-        if uploaded_file.filename == '':
-            continue
-            
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], uploaded_file.filename)
-        uploaded_file.save(file_path)
-        
-        try:
-            with open(file_path, 'rb') as f:
-                text = input_pdf_text(f)
-            
-            # Get Groq Analysis
-            response_text = get_groq_response(text, jd, input_prompt)
-            results.append({
-                "filename": uploaded_file.filename,
-                "analysis": response_text
-            })
-        except Exception as e:
-            results.append({
-                "filename": uploaded_file.filename,
-                "error": str(e)
-            })
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+    try:
+        max_parallel = int_field('max_parallel', MAX_PARALLEL, MAX_PARALLEL)
+        top_k = int_field('top_k', TOP_K)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    files, rejected = read_uploads(uploaded_files)
+    # refresh=1 skips cached text and analyses (fresh results still overwrite the cache)
+    use_cache = request.form.get('refresh', '').lower() not in ('1', 'true', 'yes')
+    results, shortlist, timing = analyze_batch(files, jd, max_parallel, use_cache, top_k)
+    # Put oversized files back at their upload position
+    for position in sorted(rejected):
+        results.insert(position, rejected[position])
     
-    return jsonify({"results": results})
+    return jsonify({"results": results, "shortlist": shortlist, "timing": timing})
+
+@app.route('/prescreen', methods=['POST'])
+def prescreen_only():
+    """Ranks resumes against the JD with TF-IDF alone: no LLM calls, answers in well under a second."""
+    jd = request.form['jd']
+    uploaded_files = request.files.getlist('resume')
+
+    if not uploaded_files or not jd:
+        return jsonify({"error": "Missing files or JD"}), 400
+
+    try:
+        top_k = int_field('top_k', TOP_K)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    batch_start = time.perf_counter()
+    files, rejected = read_uploads(uploaded_files)
+    extracted = extract_batch(files)
+    screened, prescreen_seconds = rank_batch(files, extracted, jd, top_k)
+    results = []
+    for i, entry in enumerate(extracted):
+        result = {"filename": files[i][0], "timing": entry["timing"], "cached": {"text": entry["cached"]}}
+        if entry["error"] is not None:
+            result["error"] = entry["error"]
+        else:
+            result["prescreen"] = screened[i]
+        results.append(result)
+    for position in sorted(rejected):
+        results.insert(position, rejected[position])
+    timing = {
+        "files": len(files),
+        "total_seconds": round(time.perf_counter() - batch_start, 3),
+        "prescreen_seconds": prescreen_seconds,
+        "top_k": top_k,
+    }
+    return jsonify({"results": results, "shortlist": shortlist_order(files, screened), "timing": timing})
 
 if __name__ == "__main__":
     app.run(debug=True, port=5001)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Configuration
+CACHE_DB = os.getenv("ATS_CACHE_DB", "ats_cache.db")
+TEXT_TABLE = 'pdf_text'
+ANALYSIS_TABLE = 'analysis_results'
+MAX_TEXT_BYTES = int(os.getenv("ATS_CACHE_TEXT_BYTES", str(64 * 1024 * 1024)))       # extracted text kept
+MAX_ANALYSIS_BYTES = int(os.getenv("ATS_CACHE_ANALYSIS_BYTES", str(16 * 1024 * 1024)))  # analyses kept
+
+
+def sha256(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_jd(jd):
+    """Whitespace-insensitive form of a job description, so a re-pasted JD hashes the same."""
+    return " ".join(str(jd).split())
+
+
+def analysis_key(resume_text, jd, prompt_version, model):
+    """Cache key for one analysis: resume text hash, JD hash, prompt version and model."""
+    parts = (sha256(resume_text), sha256(normalize_jd(jd)), prompt_version, model)
+    return sha256("\x00".join(parts))
+
+
+class AnalysisCache:
+    """SQLite cache for the two expensive steps of /analyze.
+
+    Extracted resume text is keyed by the PDF's content hash and the page
+    limit; analyses are keyed by analysis_key(). Each table is bounded by the
+    total size of its stored values, evicting least recently used rows first.
+    """
+
+    def __init__(self, db_file=CACHE_DB, max_text_bytes=MAX_TEXT_BYTES, max_analysis_bytes=MAX_ANALYSIS_BYTES):
+        self.db_file = db_file
+        self.limits = {TEXT_TABLE: max_text_bytes, ANALYSIS_TABLE: max_analysis_bytes}
+        self._lock = threading.Lock()
+        self.stats = {'text_hits': 0, 'text_misses': 0, 'analysis_hits': 0, 'analysis_misses': 0}
+        self._ensure_tables()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def _ensure_tables(self):
+        try:
+            conn = self._connect()
+            for table in (TEXT_TABLE, ANALYSIS_TABLE):
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed_at)")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Analysis cache error: {e}")
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _get(self, table, key):
+        try:
+            conn = self._connect()
+            row = conn.execute(f"SELECT value FROM {table} WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute(f"UPDATE {table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Analysis cache error: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _put(self, table, key, value):
+        raw = json.dumps(value)
+        try:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, raw, len(raw), time.time())
+            )
+            self._evict(conn, table)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Analysis cache error: {e}")
+
+    def _evict(self, conn, table):
+        """Drops the least recently used rows until the table fits its byte limit."""
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+        excess = total - self.limits[table]
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY accessed_at ASC"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany(f"DELETE FROM {table} WHERE key = ?", doomed)
+
+    @staticmethod
+    def text_key(pdf_hash, max_pages):
+        return f"{pdf_hash}:{max_pages}"
+
+    def get_text(self, pdf_hash, max_pages):
+        """Returns the cached {"text", "pages", "pages_skipped"} for a PDF, or None."""
+        entry = self._get(TEXT_TABLE, self.text_key(pdf_hash, max_pages))
+        self._count('text_hits' if entry is not None else 'text_misses')
+        return entry
+
+    def put_text(self, pdf_hash, max_pages, entry):
+        self._put(TEXT_TABLE, self.text_key(pdf_hash, max_pages), entry)
+
+    def get_analysis(self, key):
+        """Returns the cached analysis dict for an analysis_key(), or None."""
+        analysis = self._get(ANALYSIS_TABLE, key)
+        self._count('analysis_hits' if analysis is not None else 'analysis_misses')
+        return analysis
+
+    def put_analysis(self, key, analysis):
+        self._put(ANALYSIS_TABLE, key, analysis)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        try:
+            conn = self._connect()
+            for table in (TEXT_TABLE, ANALYSIS_TABLE):
+                rows, size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+                stats[f"{table}_rows"] = rows
+                stats[f"{table}_bytes"] = size
+            conn.close()
+        except Exception as e:
+            print(f"Analysis cache error: {e}")
+        return stats
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            for table in (TEXT_TABLE, ANALYSIS_TABLE):
+                conn.execute(f"DELETE FROM {table}")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Analysis cache error: {e}")
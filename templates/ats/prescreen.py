@@ -0,0 +1,64 @@
+"""TF-IDF pre-screen for a batch of resumes against one job description.
+
+The JD and every resume are vectorized together and scored with a single
+sparse matrix product, so a whole candidate pool is ranked in milliseconds
+and only the best matches need the (slow, paid) LLM analysis.
+"""
+import os
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Configuration
+TOP_K = int(os.getenv("ATS_TOP_K", "10"))   # resumes sent to the LLM per batch; 0 = all
+MAX_MISSING = 15                            # missing keywords reported per resume
+# Keeps tech tokens such as c++, c# and node.js whole; a trailing full stop is not part of a token
+TOKEN_PATTERN = r"(?u)\b\w(?:[\w+#]|\.(?=\w))*"
+
+
+def prescreen(jd, texts, top_k=TOP_K, max_missing=MAX_MISSING):
+    """Scores each resume text against the JD.
+
+    Returns one dict per text, in input order, with the cosine similarity
+    `score`, its 1-based `rank`, whether it made the top-k `shortlisted`, and
+    the JD's highest-weighted terms absent from the resume as
+    `missing_keywords`. top_k <= 0 shortlists everything.
+    """
+    n = len(texts)
+    if n == 0:
+        return []
+    vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True, token_pattern=TOKEN_PATTERN)
+    try:
+        matrix = vectorizer.fit_transform([jd] + list(texts))
+    except ValueError:
+        # Nothing but stop words or empty text: no basis for ranking
+        matrix = None
+
+    if matrix is None or matrix[0].nnz == 0:
+        scores = np.zeros(n)
+        missing = [[] for _ in range(n)]
+    else:
+        jd_vector = matrix[0]
+        resumes = matrix[1:]
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        scores = (resumes @ jd_vector.T).toarray().ravel()
+
+        # JD terms by weight, then one presence matrix for all resumes x those terms
+        order = np.argsort(-jd_vector.data, kind='stable')
+        columns = jd_vector.indices[order]
+        terms = vectorizer.get_feature_names_out()[columns]
+        absent = resumes[:, columns].toarray() == 0
+        missing = [terms[row][:max_missing].tolist() for row in absent]
+
+    ranking = np.argsort(-scores, kind='stable')
+    ranks = np.empty(n, dtype=int)
+    ranks[ranking] = np.arange(1, n + 1)
+    return [
+        {
+            "score": round(float(scores[i]), 4),
+            "rank": int(ranks[i]),
+            "shortlisted": bool(top_k <= 0 or ranks[i] <= top_k),
+            "missing_keywords": missing[i],
+        }
+        for i in range(n)
+    ]
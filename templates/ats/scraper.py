@@ -0,0 +1,258 @@
+"""Job-description scraping with connection reuse, an on-disk HTTP cache and early-stop text extraction.
+
+Pages are cached by URL together with their ETag/Last-Modified validators.
+A page fetched less than FRESH_SECONDS ago is served without touching the
+network; older entries are revalidated with a conditional request, and a
+304 reuses the stored HTML. Text extraction parses a prefix of the page and
+stops as soon as the character budget is filled.
+"""
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from bs4.element import CData, NavigableString, PreformattedString
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.util.retry import Retry
+
+# Configuration
+CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", "scrape_cache")
+FRESH_SECONDS = int(os.getenv("SCRAPE_FRESH_SECONDS", "600"))   # reuse without revalidating
+TIMEOUT = 10
+MAX_CHARS = 5000                # roughly what fits the analysis prompt
+MAX_HTML_BYTES = 3 * 1024 * 1024    # stop downloading huge pages
+PARSE_PREFIX = 64 * 1024        # HTML characters parsed first; grown 4x while the text budget is not filled
+POOL_SIZE = 8
+USER_AGENT = 'Mozilla/5.0'
+SKIP_TAGS = {'script', 'style'}
+
+
+def default_parser():
+    """lxml's C parser when installed, otherwise the pure-Python html.parser."""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+PARSER = os.getenv("SCRAPE_PARSER") or default_parser()
+
+
+def create_session(pool_size=POOL_SIZE):
+    """requests.Session with pooled keep-alive connections and a small retry budget."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class PageCache:
+    """One gzip'd HTML file plus a JSON metadata file per URL."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.html.gz'
+
+    def get(self, url):
+        """Returns (meta, html) or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, meta, html):
+        meta_path, body_path = self._paths(url)
+        # Body first, then metadata, each via rename, so a reader never pairs new metadata with old HTML
+        for path, write in ((body_path, lambda p: _write_gzip(p, html)),
+                            (meta_path, lambda p: _write_json(p, meta))):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            write(tmp_path)
+            os.replace(tmp_path, path)
+
+    def touch(self, url, meta):
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        _write_json(tmp_path, meta)
+        os.replace(tmp_path, meta_path)
+
+
+def _write_gzip(path, text):
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=5) as f:
+        f.write(text)
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def extract_text(html, max_chars=MAX_CHARS, parser=PARSER):
+    """Visible page text, one phrase per line, cut at max_chars.
+
+    Same output as get_text() followed by the line/phrase clean-up. Parsing
+    is the expensive part, so only a prefix of the HTML is parsed, growing
+    until the budget fills with text that ends before the cut.
+    """
+    size = PARSE_PREFIX
+    while True:
+        text, filled = _walk_text(BeautifulSoup(html[:size], parser), max_chars)
+        if filled or size >= len(html):
+            return text
+        size *= 4
+
+
+def _walk_text(soup, max_chars):
+    """Returns (text, filled); walks the document lazily and stops once the budget is full."""
+    lines = []
+    size = 0
+    pending = ''
+
+    def emit(line):
+        nonlocal size
+        # Break multi-headlines into a line each
+        for phrase in line.strip().split("  "):
+            phrase = phrase.strip()
+            if phrase:
+                lines.append(phrase)
+                size += len(phrase) + 1
+        return size > max_chars
+
+    for string in soup.descendants:
+        # get_text() counts plain strings and CDATA, not comments, doctypes and the like
+        if not isinstance(string, NavigableString):
+            continue
+        if isinstance(string, PreformattedString) and not isinstance(string, CData):
+            continue
+        if string.parent is not None and string.parent.name in SKIP_TAGS:
+            continue
+        parts = str(string).splitlines(True)
+        if not parts:
+            continue
+        # Adjacent strings join without a separator, exactly as get_text() concatenates them
+        parts[0] = pending + parts[0]
+        pending = parts.pop() if parts[-1].splitlines()[0] == parts[-1] else ''
+        if any(emit(line) for line in parts):
+            break
+        if len(pending) > 2 * max_chars and '  ' in pending:
+            # A huge line (minified HTML): phrases before the last double space are already final
+            cut = pending.rfind('  ')
+            if emit(pending[:cut]):
+                break
+            pending = pending[cut:]
+    else:
+        emit(pending)
+        return '\n'.join(lines)[:max_chars], False
+    # Every emitted line ended before the last string seen, so a cut further on cannot change it
+    return '\n'.join(lines)[:max_chars], True
+
+
+class Scraper:
+    """Fetches job descriptions through a shared session and the page cache."""
+
+    def __init__(self, cache_dir=CACHE_DIR, fresh_seconds=FRESH_SECONDS, parser=PARSER, session=None):
+        self.session = session or create_session()
+        self.cache = PageCache(cache_dir)
+        self.fresh_seconds = fresh_seconds
+        self.parser = parser
+        self._lock = threading.Lock()
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'fetched': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch_html(self, url):
+        """Returns (html, source) where source is 'cache', 'revalidated' or 'network'."""
+        cached = self.cache.get(url)
+        now = time.time()
+        headers = {}
+        if cached:
+            meta, html = cached
+            if now - meta.get('checked_at', 0) < self.fresh_seconds:
+                self._count('fresh_hits')
+                return html, 'cache'
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        with self.session.get(url, headers=headers, timeout=TIMEOUT, stream=True) as response:
+            if response.status_code == 304 and cached:
+                meta['checked_at'] = now
+                self.cache.touch(url, meta)
+                self._count('revalidated')
+                return html, 'revalidated'
+            response.raise_for_status()
+            html = _read_limited(response, MAX_HTML_BYTES)
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'checked_at': now,
+            }
+        if meta['etag'] or meta['last_modified'] or self.fresh_seconds > 0:
+            self.cache.put(url, meta, html)
+        self._count('fetched')
+        return html, 'network'
+
+    def scrape(self, url, max_chars=MAX_CHARS):
+        """Returns (text, source)."""
+        html, source = self.fetch_html(url)
+        return extract_text(html, max_chars, self.parser), source
+
+
+def _read_limited(response, max_bytes):
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    raw = b''.join(chunks)[:max_bytes]
+    return raw.decode(_detect_encoding(response.headers.get('Content-Type', ''), raw), errors='replace')
+
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+
+def _detect_encoding(content_type, raw):
+    """Header charset, then a <meta> charset near the top, then a guess from the bytes, then UTF-8.
+
+    Works on the bytes already read: response.apparent_encoding would need the
+    body again, and the stream has been consumed by then.
+    """
+    match = _HEADER_CHARSET_RE.search(content_type) or _META_CHARSET_RE.search(raw[:4096])
+    candidates = [match.group(1)] if match else []
+    if chardet is not None:
+        candidates.append(chardet.detect(raw[:64 * 1024]).get('encoding'))
+    for name in candidates:
+        if not name:
+            continue
+        name = name.decode('ascii') if isinstance(name, bytes) else name
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return 'utf-8'
@@ -0,0 +1,134 @@
+"""Checks the JD scraper against a local fixture server.
+
+Serves generated job pages with ETag/Last-Modified support and verifies:
+cache hits skip the network, stale entries revalidate with a 304, the
+extracted text matches the original get_text() clean-up, and extraction of
+a large page stops early.
+
+Usage:
+    python -m templates.ats.verify_scraper      # from the repository root
+"""
+import hashlib
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bs4 import BeautifulSoup
+
+from .scraper import Scraper, extract_text, MAX_CHARS
+
+LAST_MODIFIED = formatdate(time.time() - 3600, usegmt=True)
+
+
+def job_page(sections):
+    parts = ["<html><head><title>Data Engineer</title><style>body { color: red; }</style>",
+             "<script>var tracking = 'ignore me';</script></head><body>",
+             "<!-- navigation comment --><nav>Home  Jobs  About</nav>"]
+    for i in range(sections):
+        parts.append(f"<h2>Section {i}</h2><p>We need Python, SQL and Spark.  Build   pipelines "
+                     f"for team {i}.<br>Nice to have: <b>Airflow</b> and <i>dbt</i>.</p>\n"
+                     f"<ul><li>Requirement {i}a</li>\n<li>Requirement {i}b</li></ul>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+PAGES = {
+    '/small': job_page(20),
+    '/large': job_page(5000),
+    '/no-charset': "<html><body><h1>Ingénieur données – Zürich</h1><p>Café, naïve, São Paulo</p></body></html>",
+}
+CONTENT_TYPES = {'/no-charset': 'text/html'}  # served without a charset parameter
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES.get(self.path, 'text/html; charset=utf-8'))
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def reference_text(html):
+    """The original /scrape extraction."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.extract()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return '\n'.join(chunk for chunk in chunks if chunk)[:MAX_CHARS]
+
+
+def check(label, condition):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    return condition
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    passed = True
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scraper = Scraper(cache_dir=cache_dir, fresh_seconds=600, parser='html.parser')
+        text, source = scraper.scrape(base + '/small')
+        passed &= check("first fetch comes from the network", source == 'network')
+        passed &= check("text matches the original extraction", text == reference_text(PAGES['/small']))
+
+        FixtureHandler.hits.clear()
+        start = time.perf_counter()
+        text_again, source = scraper.scrape(base + '/small')
+        cached_ms = (time.perf_counter() - start) * 1000
+        passed &= check(f"repeat fetch is a cache hit ({cached_ms:.1f} ms)",
+                        source == 'cache' and not FixtureHandler.hits and text_again == text)
+
+        stale = Scraper(cache_dir=cache_dir, fresh_seconds=0, parser='html.parser')
+        text_again, source = stale.scrape(base + '/small')
+        passed &= check("stale entry revalidates with a 304",
+                        source == 'revalidated' and FixtureHandler.hits == ['/small'] and text_again == text)
+
+        text, source = scraper.scrape(base + '/no-charset')
+        passed &= check("page without a charset decodes from its bytes",
+                        source == 'network' and text == reference_text(PAGES['/no-charset']))
+
+        html, _ = scraper.fetch_html(base + '/large')
+        start = time.perf_counter()
+        full = reference_text(html)
+        reference_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        text = extract_text(html, parser='html.parser')
+        early_ms = (time.perf_counter() - start) * 1000
+        passed &= check(f"large page matches the original ({len(html) // 1024} KB HTML)", text == full)
+        print(f"     original extraction {reference_ms:.0f} ms, early-stop extraction {early_ms:.0f} ms")
+        print(f"     scraper stats: {scraper.stats}")
+
+    server.shutdown()
+    print("All checks passed." if passed else "Some checks failed.")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,4 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from similarity_index import SimilarityIndex
 
 # -----------------------------
 # Recipe Dataset
@@ -28,41 +27,30 @@ recipes = [
 ]
 
 # -----------------------------
-# User Input
-# -----------------------------
-user_ingredients = input("Enter available ingredients (comma separated): ")
-user_ingredients = user_ingredients.replace(",", " ")
-
-# -----------------------------
-# Prepare Data
+# TF-IDF Index (fitted once on the recipes)
 # -----------------------------
 recipe_texts = [recipe["ingredients"] for recipe in recipes]
-print(recipe_texts)
-recipe_texts.append(user_ingredients)
-print(recipe_texts) 
+index = SimilarityIndex.fit(recipe_texts)
 
 # -----------------------------
-# TF-IDF Vectorization
+# User Input
 # -----------------------------
-vectorizer = TfidfVectorizer()
-tfidf_matrix = vectorizer.fit_transform(recipe_texts)
+user_ingredients = input("Enter available ingredients (comma separated): ")
+user_ingredients = user_ingredients.replace(",", " ")
 
 # -----------------------------
-# Cosine Similarity
+# Top-K Cosine Similarity (only the query is vectorized)
 # -----------------------------
-similarity_scores = cosine_similarity(
-    tfidf_matrix[-1],  # user input
-    tfidf_matrix[:-1]  # recipes
-)[0]
+matches = index.query(user_ingredients, k=len(recipes))
 
 # -----------------------------
 # Display Results
 # -----------------------------
 print("\nRecommended Recipes:\n")
 
-for index, score in enumerate(similarity_scores):
+for recipe_index, score in matches:
     if score > 0:
-        print(f"🍽 {recipes[index]['name']}  | Match Score: {round(score, 2)}")
+        print(f"🍽 {recipes[recipe_index]['name']}  | Match Score: {round(score, 2)}")
 
-if max(similarity_scores) == 0:
+if not matches or matches[0][1] == 0:
     print("❌ No matching recipes found.")
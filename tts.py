@@ -0,0 +1,318 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import scipy.io.wavfile as wav
+import sounddevice as sd
+
+# Configuration
+TTS_BACKEND = os.getenv('TTS_BACKEND', 'auto')          # auto | powershell | espeak | bark
+TTS_VOICE = os.getenv('TTS_VOICE', '')                  # backend-specific voice name; empty = default
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', 'tts_cache')
+PRERENDER_WORKERS = 2       # concurrent renders during batch pre-rendering
+PRERENDER_BATCH = 50        # texts per PowerShell process when pre-rendering
+PRERENDER_AHEAD = 20        # upcoming words rendered when a queue is loaded; warm_context.py --speech does all
+
+# Phrases the game says regardless of the word
+FIXED_PHRASES = [
+    "I didn't hear anything.",
+    "Pausing. Click Resume to continue.",
+]
+
+
+def word_phrases(word):
+    """Every prompt and feedback sentence the game can say about `word`."""
+    return [
+        f"The word is {word}. Please spell {word}",
+        f"Please spell {word}",
+        f"Correct! The word is {word}.",
+        f"Incorrect. The word is {word}.",
+    ]
+
+
+class TTSBackend:
+    """Renders text to a WAV file."""
+
+    name = 'base'
+
+    def __init__(self, voice=TTS_VOICE):
+        self.voice = voice
+
+    def render(self, text, path):
+        raise NotImplementedError
+
+    def render_many(self, items):
+        """Renders (text, path) pairs; backends with expensive startup override this to batch."""
+        for text, path in items:
+            self.render(text, path)
+
+
+def _ps_quote(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+class PowerShellBackend(TTSBackend):
+    """Windows System.Speech synthesizer driven through PowerShell."""
+
+    name = 'powershell'
+
+    def _script(self, items):
+        lines = ["Add-Type -AssemblyName System.Speech;",
+                 "$s = New-Object System.Speech.Synthesis.SpeechSynthesizer;"]
+        if self.voice:
+            lines.append(f"$s.SelectVoice({_ps_quote(self.voice)});")
+        for text, path in items:
+            lines.append(f"$s.SetOutputToWaveFile({_ps_quote(os.path.abspath(path))}); $s.Speak({_ps_quote(text)});")
+        lines.append("$s.Dispose();")
+        return " ".join(lines)
+
+    def render(self, text, path):
+        self.render_many([(text, path)])
+
+    def render_many(self, items):
+        # One process for the whole batch: PowerShell startup costs more than the synthesis
+        items = list(items)
+        if items:
+            subprocess.run(["powershell", "-NoProfile", "-Command", self._script(items)], shell=False, check=True)
+
+
+class EspeakBackend(TTSBackend):
+    """Offline espeak-ng (or espeak) synthesizer for Linux and macOS."""
+
+    name = 'espeak'
+
+    def __init__(self, voice=TTS_VOICE):
+        super().__init__(voice)
+        self.executable = shutil.which('espeak-ng') or shutil.which('espeak')
+        if not self.executable:
+            raise FileNotFoundError("espeak-ng not found. Install it (e.g. apt install espeak-ng).")
+
+    def render(self, text, path):
+        command = [self.executable, '-w', path]
+        if self.voice:
+            command += ['-v', self.voice]
+        subprocess.run(command + ['--', text], shell=False, check=True, capture_output=True)
+
+
+class BarkBackend(TTSBackend):
+    """Bark voices rendered by a running bark_worker.py, which keeps the model loaded."""
+
+    name = 'bark'
+
+    def __init__(self, voice=TTS_VOICE, address=None):
+        from bark_worker import BarkClient, WORKER_ADDRESS
+        from speak_words import VOICE_PRESET, SAMPLE_RATE
+        super().__init__(voice or VOICE_PRESET)
+        self.sample_rate = SAMPLE_RATE
+        self.client = BarkClient(address or WORKER_ADDRESS)
+
+    def render(self, text, path):
+        self.render_many([(text, path)])
+
+    def render_many(self, items):
+        items = list(items)
+        if not items:
+            return
+        clips = self.client.synthesize([text for text, _ in items], self.voice)
+        for (_, path), samples in zip(items, clips):
+            wav.write(path, self.sample_rate, samples)
+
+
+def create_backend(backend=TTS_BACKEND, voice=TTS_VOICE):
+    """Builds the configured TTS backend; 'auto' picks PowerShell on Windows and espeak elsewhere."""
+    if backend == 'auto':
+        backend = 'powershell' if sys.platform == 'win32' else 'espeak'
+    if backend == 'espeak':
+        return EspeakBackend(voice)
+    if backend == 'bark':
+        return BarkBackend(voice)
+    return PowerShellBackend(voice)
+
+
+class AudioCache:
+    """Content-addressed store of rendered speech: one WAV per (backend, voice, text).
+
+    Files are named by a hash of the key and written through a temp file plus
+    rename, so concurrent renders of the same text never expose a partial file.
+    """
+
+    def __init__(self, backend, cache_dir=TTS_CACHE_DIR):
+        self.backend = backend
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rendering = {}
+        self.stats = {'hits': 0, 'misses': 0, 'rendered': 0, 'errors': 0}
+
+    def key(self, text):
+        text = " ".join(str(text).split())
+        raw = f"{self.backend.name}\x00{self.backend.voice}\x00{text}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, text):
+        digest = self.key(text)
+        return os.path.join(self.cache_dir, digest[:2], digest + '.wav')
+
+    def get(self, text):
+        """Returns the cached WAV path for text, rendering it first on a miss.
+
+        Raises RuntimeError when the backend produced no audio for it.
+        """
+        path = self.path_for(text)
+        if os.path.exists(path):
+            with self._lock:
+                self.stats['hits'] += 1
+            return path
+        with self._lock:
+            self.stats['misses'] += 1
+            # Another thread is already rendering this text: wait for it instead of rendering twice
+            event = self._rendering.get(path)
+            owner = event is None
+            if owner:
+                event = self._rendering[path] = threading.Event()
+        if not owner:
+            event.wait()
+            if os.path.exists(path):
+                return path
+        try:
+            self._render_batch([(text, path)])
+        finally:
+            if owner:
+                with self._lock:
+                    self._rendering.pop(path, None)
+                event.set()
+        if not os.path.exists(path):
+            raise RuntimeError(f"{self.backend.name} produced no audio for {text!r}")
+        return path
+
+    def _render_batch(self, items):
+        """Renders items and moves each non-empty result into place; returns how many were."""
+        staged = []
+        for text, path in items:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=os.path.dirname(path))
+            os.close(fd)
+            staged.append((text, tmp_path, path))
+        try:
+            self.backend.render_many([(text, tmp_path) for text, tmp_path, _ in staged])
+            moved = 0
+            for _, tmp_path, path in staged:
+                if os.path.getsize(tmp_path):
+                    os.replace(tmp_path, path)
+                    moved += 1
+            with self._lock:
+                self.stats['rendered'] += moved
+            return moved
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            for _, tmp_path, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def missing(self, texts):
+        """Returns the unique texts that have no cached audio yet."""
+        seen = set()
+        result = []
+        for text in texts:
+            path = self.path_for(text)
+            if path not in seen and not os.path.exists(path):
+                seen.add(path)
+                result.append(text)
+        return result
+
+    def prerender(self, texts, max_workers=PRERENDER_WORKERS, batch_size=PRERENDER_BATCH, cancel_event=None):
+        """Renders every uncached text in batches. Returns how many were rendered."""
+        todo = [(text, self.path_for(text)) for text in self.missing(texts)]
+        batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+        def run(batch):
+            if cancel_event is not None and cancel_event.is_set():
+                return 0
+            try:
+                return self._render_batch(batch)
+            except Exception as e:
+                print(f"TTS pre-render error: {e}")
+                return 0
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts') as pool:
+            return sum(pool.map(run, batches))
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        looked_up = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / looked_up if looked_up else 0.0
+        stats['backend'] = self.backend.name
+        return stats
+
+
+def play_wav(path):
+    """Plays a WAV file on the default output device and blocks until it finishes."""
+    rate, samples = wav.read(path)
+    sd.play(samples, rate)
+    sd.wait()
+
+
+class TextToSpeech:
+    """Speaks text from the audio cache, rendering anything not seen before."""
+
+    def __init__(self, backend=None, cache_dir=TTS_CACHE_DIR):
+        self.cache = AudioCache(backend or create_backend(), cache_dir)
+        self._prerender_lock = threading.Lock()
+        self._prerender_cancel = {}     # owner -> cancel event of its running pre-render
+
+    def speak(self, text):
+        play_wav(self.cache.get(text))
+
+    def warm(self, word):
+        """Renders the prompts for one word (a prefetcher task)."""
+        for text in word_phrases(word):
+            self.cache.get(text)
+
+    def phrases(self, words):
+        """The fixed phrases plus every prompt for words."""
+        texts = list(FIXED_PHRASES)
+        for word in words:
+            texts.extend(word_phrases(word))
+        return texts
+
+    def prerender_async(self, words, owner=None):
+        """Pre-renders fixed phrases and the given words' prompts in the background.
+
+        A newer call for the same owner cancels the batches the older one has
+        not started yet; other owners' pre-renders keep going.
+        """
+        with self._prerender_lock:
+            self._cancel_prerender(owner)
+            cancel_event = self._prerender_cancel[owner] = threading.Event()
+        texts = self.phrases(words)
+
+        def run():
+            try:
+                count = self.cache.prerender(texts, cancel_event=cancel_event)
+                if count:
+                    print(f"Pre-rendered {count} TTS phrases.")
+            finally:
+                with self._prerender_lock:
+                    if self._prerender_cancel.get(owner) is cancel_event:
+                        del self._prerender_cancel[owner]
+        thread = threading.Thread(target=run, daemon=True, name='tts-prerender')
+        thread.start()
+        return thread
+
+    def cancel_prerender(self, owner=None):
+        with self._prerender_lock:
+            self._cancel_prerender(owner)
+
+    def _cancel_prerender(self, owner):
+        cancel_event = self._prerender_cancel.pop(owner, None)
+        if cancel_event is not None:
+            cancel_event.set()
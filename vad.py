@@ -0,0 +1,162 @@
+import numpy as np
+
+# Configuration
+FRAME_MS = 20               # analysis frame length
+CALIBRATION_MS = 300        # leading audio used to measure the room's noise floor
+END_OF_SPEECH_MS = 1500     # trailing silence that ends an utterance
+MIN_SPEECH_MS = 60          # consecutive speech needed to count as an onset
+ENERGY_RATIO = 3.0          # speech must be this many times louder than the noise floor
+MIN_ENERGY = 80.0           # absolute RMS floor, so a silent room does not make everything speech
+ZCR_THRESHOLD = 0.25        # zero-crossing rate that marks quieter unvoiced sounds ("s", "f")
+FLOOR_ADAPT = 0.05          # how fast the noise floor follows the room before speech starts
+
+
+def frame_features(samples, frame_size):
+    """Returns per-frame RMS energy and zero-crossing rate for whole frames of `samples`."""
+    count = len(samples) // frame_size
+    if count == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    frames = samples[:count * frame_size].reshape(count, frame_size).astype(np.float32)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_size - 1)
+    return energy, zcr.astype(np.float32)
+
+
+class VoiceActivityDetector:
+    """Streaming end-pointer for a single utterance.
+
+    Audio is cut into fixed frames and classified in bulk with NumPy: a frame
+    is speech if its energy clears a threshold derived from the noise floor
+    measured over the first frames, or if it clears half of that with a high
+    zero-crossing rate. Speech starts after MIN_SPEECH_MS of consecutive
+    speech frames and ends after END_OF_SPEECH_MS without any (the hangover).
+    """
+
+    def __init__(self, sample_rate, frame_ms=FRAME_MS, calibration_ms=CALIBRATION_MS,
+                 end_of_speech_ms=END_OF_SPEECH_MS, min_speech_ms=MIN_SPEECH_MS,
+                 energy_ratio=ENERGY_RATIO, min_energy=MIN_ENERGY, zcr_threshold=ZCR_THRESHOLD):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.end_frames = max(1, end_of_speech_ms // frame_ms)
+        self.onset_frames = max(1, min_speech_ms // frame_ms)
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.zcr_threshold = zcr_threshold
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = None
+        self._calibration = []
+        self._residual = np.empty(0, dtype=np.int16)
+        self._frames_seen = 0
+        self._run = 0
+        self._silence = 0
+        self.speech_started = False
+        self.ended = False
+        self.speech_start_frame = None
+        self.speech_end_frame = None
+
+    @property
+    def threshold(self):
+        floor = self.noise_floor if self.noise_floor is not None else 0.0
+        return max(self.min_energy, floor * self.energy_ratio)
+
+    def _seconds(self, frame):
+        return None if frame is None else frame * self.frame_size / self.sample_rate
+
+    @property
+    def speech_start(self):
+        """Onset time in seconds from the first sample, or None."""
+        return self._seconds(self.speech_start_frame)
+
+    @property
+    def speech_end(self):
+        """End of the last speech frame in seconds, or None."""
+        return self._seconds(self.speech_end_frame)
+
+    def process(self, samples):
+        """Feeds mono int16 samples. Returns True once the utterance has ended."""
+        if self.ended:
+            return True
+        samples = np.asarray(samples).reshape(-1)
+        if len(self._residual):
+            samples = np.concatenate((self._residual, samples))
+        energy, zcr = frame_features(samples, self.frame_size)
+        self._residual = samples[len(energy) * self.frame_size:].copy()
+
+        start = 0
+        if self.noise_floor is None:
+            needed = self.calibration_frames - len(self._calibration)
+            self._calibration.extend(energy[:needed].tolist())
+            start = min(needed, len(energy))
+            self._frames_seen += start
+            if len(self._calibration) < self.calibration_frames:
+                return False
+            self.noise_floor = float(np.median(self._calibration))
+
+        threshold = self.threshold
+        energy, zcr = energy[start:], zcr[start:]
+        is_speech = (energy > threshold) | ((energy > threshold / 2) & (zcr > self.zcr_threshold))
+
+        for i, speech in enumerate(is_speech.tolist()):
+            frame = self._frames_seen + i
+            if speech:
+                self._run += 1
+                self._silence = 0
+                if not self.speech_started and self._run >= self.onset_frames:
+                    self.speech_started = True
+                    self.speech_start_frame = frame - self._run + 1
+                if self.speech_started:
+                    self.speech_end_frame = frame + 1
+            else:
+                self._run = 0
+                if self.speech_started:
+                    self._silence += 1
+                    if self._silence >= self.end_frames:
+                        self.ended = True
+                        self._frames_seen = frame + 1
+                        return True
+                else:
+                    # Track slow changes in room noise until the speaker starts
+                    self.noise_floor += FLOOR_ADAPT * (float(energy[i]) - self.noise_floor)
+                    threshold = self.threshold
+        self._frames_seen += len(is_speech)
+        return False
+
+
+class FixedThresholdDetector:
+    """The original detector: mean absolute amplitude above 80, stop after 2 s of quiet."""
+
+    def __init__(self, sample_rate, silence_threshold=80, required_silence_duration=2.0):
+        self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold
+        self.required_silence_duration = required_silence_duration
+        self.reset()
+
+    def reset(self):
+        self.speech_started = False
+        self.ended = False
+        self._silence = 0.0
+        self._samples = 0
+        self.speech_start = None
+        self.speech_end = None
+
+    def process(self, samples):
+        samples = np.asarray(samples).reshape(-1)
+        if self.ended or not len(samples):
+            return self.ended
+        position = self._samples / self.sample_rate
+        self._samples += len(samples)
+        if np.abs(samples.astype(np.int32)).mean() > self.silence_threshold:
+            if not self.speech_started:
+                self.speech_started = True
+                self.speech_start = position
+            self._silence = 0.0
+            self.speech_end = self._samples / self.sample_rate
+        elif self.speech_started:
+            self._silence += len(samples) / self.sample_rate
+            if self._silence >= self.required_silence_duration:
+                self.ended = True
+        return self.ended
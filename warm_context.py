@@ -0,0 +1,53 @@
+"""Pre-warms the LLM context cache for a whole filter set with bulk requests.
+
+Usage:
+    python warm_context.py                          # every word
+    python warm_context.py --year 2024 --list "School Spelling Bee" --batch-size 30
+    python warm_context.py --speech                 # also render every word's spoken prompts
+"""
+import argparse
+import time
+
+from spelling_bee import SpellingBeeGame, normalize_filters, CONTEXT_BATCH_SIZE, CONTEXT_BATCH_RETRIES, FALLBACK_CONTEXT
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch and cache word context for every word in a filter set.")
+    parser.add_argument('--year', help="Year filter (default: all)")
+    parser.add_argument('--list', dest='list_type', help="List filter (default: all)")
+    parser.add_argument('--difficulty', help="Difficulty filter (default: all)")
+    parser.add_argument('--batch-size', type=int, default=CONTEXT_BATCH_SIZE, help="Words per request")
+    parser.add_argument('--retries', type=int, default=CONTEXT_BATCH_RETRIES,
+                        help="Extra rounds for words a response left out")
+    parser.add_argument('--speech', action='store_true',
+                        help="Also pre-render the spoken prompts of every word into the TTS cache")
+    args = parser.parse_args()
+
+    game = SpellingBeeGame()
+    filters = normalize_filters(args.year, args.list_type, args.difficulty)
+    words = sorted({game.catalog.words[p] for p in game.catalog.select(filters)})
+    print(f"Warming context for {len(words)} words with filters: {filters}")
+
+    before = dict(game.context_cache.stats)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        print(f"  {done}/{total} words ({done / elapsed:.1f} words/s)")
+
+    results = game.get_contexts(words, batch_size=args.batch_size, retries=args.retries, progress=progress)
+    elapsed = time.perf_counter() - start
+    cached = (game.context_cache.stats['memory_hits'] + game.context_cache.stats['db_hits']
+              - before['memory_hits'] - before['db_hits'])
+    failed = sum(1 for details in results.values() if details == FALLBACK_CONTEXT)
+    print(f"Done in {elapsed:.1f}s: {len(results)} words, {cached} already cached, {failed} failed.")
+
+    if args.speech and game.tts is not None:
+        start = time.perf_counter()
+        rendered = game.tts.cache.prerender(game.tts.phrases(words))
+        print(f"Rendered {rendered} spoken prompts in {time.perf_counter() - start:.1f}s.")
+    game.prefetcher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
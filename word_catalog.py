@@ -0,0 +1,151 @@
+import sqlite3
+import sys
+import threading
+
+from word_sync import TABLE_NAME, MANIFEST_TABLE
+
+# Facet name -> bee_words column
+FACETS = ('year', 'list', 'difficulty')
+
+
+def _bitmap(positions, size):
+    """Packs a list of row positions into an int whose bit i is set for each position."""
+    buf = bytearray(size // 8 + 1)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _positions(bitmap):
+    """Unpacks a bitmap back into sorted row positions."""
+    bits = bin(bitmap)[:1:-1]  # least significant bit first
+    out = []
+    i = bits.find('1')
+    while i != -1:
+        out.append(i)
+        i = bits.find('1', i + 1)
+    return out
+
+
+def _popcount(bitmap):
+    return bin(bitmap).count('1')
+
+
+class WordCatalog:
+    """Read-only, in-memory view of bee_words for fast filtering.
+
+    Rows are loaded once into parallel lists (with interned strings) and each
+    facet value gets a bitmap of the rows that carry it, so a filter
+    combination is a couple of big-int ANDs instead of a SQL query. The
+    catalog reloads itself only when the sync manifest changes.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.ids = []
+        self.words = []
+        self.facets = {name: {} for name in FACETS}
+        self.signature = None
+        self._all = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self.words)
+
+    def _read_signature(self, conn):
+        try:
+            return tuple(conn.execute(
+                f"SELECT source, file_hash, schema_version, synced_at FROM {MANIFEST_TABLE} ORDER BY source"
+            ).fetchall())
+        except sqlite3.OperationalError:
+            return None
+
+    def load(self):
+        try:
+            conn = sqlite3.connect(self.db_file)
+            signature = self._read_signature(conn)
+            rows = conn.execute(
+                f"SELECT id, clean_word, year, list, difficulty FROM {TABLE_NAME} ORDER BY id"
+            ).fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"Catalog error: {e}")
+            return
+
+        ids = []
+        words = []
+        postings = {name: {} for name in FACETS}
+        for pos, (word_id, word, *values) in enumerate(rows):
+            ids.append(word_id)
+            words.append(sys.intern(word))
+            for name, value in zip(FACETS, values):
+                if value is not None:
+                    postings[name].setdefault(sys.intern(str(value)), []).append(pos)
+
+        size = len(words)
+        facets = {name: {value: _bitmap(positions, size) for value, positions in values.items()}
+                  for name, values in postings.items()}
+
+        with self._lock:
+            self.ids = ids
+            self.words = words
+            self.facets = facets
+            self._all = (1 << size) - 1
+            self.signature = signature
+        print(f"Catalog loaded {size} words.")
+
+    def refresh_if_stale(self):
+        """Reloads the catalog if the sync manifest changed since it was built. Returns True if reloaded."""
+        try:
+            conn = sqlite3.connect(self.db_file)
+            signature = self._read_signature(conn)
+            conn.close()
+        except Exception as e:
+            print(f"Catalog error: {e}")
+            return False
+        if signature == self.signature:
+            return False
+        self.load()
+        return True
+
+    def _mask(self, filters, skip=None):
+        mask = self._all
+        for name in FACETS:
+            value = filters.get(name)
+            if value is None or name == skip:
+                continue
+            mask &= self.facets[name].get(str(value), 0)
+            if not mask:
+                break
+        return mask
+
+    def select(self, filters):
+        """Returns catalog positions of the words matching all non-None filters."""
+        with self._lock:
+            return _positions(self._mask(filters))
+
+    def count(self, filters):
+        with self._lock:
+            return _popcount(self._mask(filters))
+
+    def facet_counts(self, filters=None):
+        """Counts per facet value, each facet restricted by the *other* active filters."""
+        filters = filters or {}
+        counts = {}
+        with self._lock:
+            for name in FACETS:
+                base = self._mask(filters, skip=name)
+                counts[name] = {value: _popcount(base & bitmap) for value, bitmap in self.facets[name].items()}
+        return counts
+
+    def metadata(self, filters=None):
+        """Facet values in the shape the UI expects, plus per-value counts."""
+        counts = self.facet_counts(filters)
+        return {
+            'years': sorted(self.facets['year'], reverse=True),
+            'lists': sorted(self.facets['list']),
+            'difficulties': sorted(self.facets['difficulty']),
+            'counts': {'years': counts['year'], 'lists': counts['list'], 'difficulties': counts['difficulty']},
+            'total': self.count(filters or {})
+        }
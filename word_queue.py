@@ -0,0 +1,126 @@
+import random
+import sqlite3
+import time
+from array import array
+
+# Configuration
+QUEUE_TABLE = 'queue_state'
+
+
+class WordQueue:
+    """Endless rotation over a fixed set of items with O(1) next().
+
+    Items are kept in an array with a cursor instead of a list that is popped
+    from the front. In shuffled mode the permutation is drawn lazily (one
+    Fisher-Yates step per served or peeked item) from a seeded RNG, so
+    building a queue costs no shuffle up front, every pass through the items
+    gets a fresh order, and the whole position can be restored from
+    (seed, cycle, cursor).
+    """
+
+    def __init__(self, items, shuffle=True, seed=None, cycle=0, cursor=0):
+        self._items = array('l', items)
+        self.shuffle = shuffle
+        self.seed = random.randrange(1 << 31) if seed is None else seed
+        self.signature = None
+        self._start_cycle(cycle)
+        # Replay the draws that had already happened before the state was saved
+        self._draw_until(min(cursor, len(self._items)))
+        self.cursor = min(cursor, len(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def _start_cycle(self, cycle):
+        self.cycle = cycle
+        self.cursor = 0
+        if self.shuffle:
+            self._order = array('l', self._items)
+            self._rng = random.Random(f"{self.seed}:{cycle}")
+            self._drawn = 0
+        else:
+            self._order = self._items
+            self._drawn = len(self._items)
+
+    def _draw_until(self, count):
+        order = self._order
+        n = len(order)
+        rng = self._rng if self.shuffle else None
+        while self._drawn < count:
+            j = rng.randrange(self._drawn, n)
+            order[self._drawn], order[j] = order[j], order[self._drawn]
+            self._drawn += 1
+
+    def next(self):
+        """Returns the next item, starting a new (reshuffled) pass after the last one."""
+        if not self._items:
+            return None
+        if self.cursor >= len(self._order):
+            self._start_cycle(self.cycle + 1)
+        self._draw_until(self.cursor + 1)
+        item = self._order[self.cursor]
+        self.cursor += 1
+        return item
+
+    def peek(self, count):
+        """Returns up to `count` upcoming items of the current pass without consuming them."""
+        end = min(self.cursor + count, len(self._order))
+        self._draw_until(end)
+        return list(self._order[self.cursor:end])
+
+    def nbytes(self):
+        """Approximate memory held by the item arrays."""
+        size = self._items.itemsize * len(self._items)
+        if self._order is not self._items:
+            size += self._order.itemsize * len(self._order)
+        return size
+
+    def state(self):
+        return {'seed': self.seed, 'cycle': self.cycle, 'cursor': self.cursor}
+
+
+def _ensure_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+            key TEXT PRIMARY KEY,
+            signature TEXT,
+            seed INTEGER NOT NULL,
+            cycle INTEGER NOT NULL,
+            cursor INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+def save_queue_state(db_file, key, signature, queue):
+    """Stores the queue position under `key`; `signature` identifies the item set it belongs to."""
+    try:
+        conn = sqlite3.connect(db_file, timeout=10)
+        _ensure_table(conn)
+        state = queue.state()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {QUEUE_TABLE} (key, signature, seed, cycle, cursor, updated_at) "
+            f"VALUES (?, ?, ?, ?, ?, ?)",
+            (key, signature, state['seed'], state['cycle'], state['cursor'], time.time())
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Queue state error: {e}")
+
+
+def load_queue_state(db_file, key, signature):
+    """Returns the saved state for `key`, or None if missing or saved for a different item set."""
+    try:
+        conn = sqlite3.connect(db_file, timeout=10)
+        _ensure_table(conn)
+        row = conn.execute(
+            f"SELECT signature, seed, cycle, cursor FROM {QUEUE_TABLE} WHERE key = ?", (key,)
+        ).fetchone()
+        conn.close()
+    except Exception as e:
+        print(f"Queue state error: {e}")
+        return None
+    if row is None or row[0] != signature:
+        return None
+    return {'seed': row[1], 'cycle': row[2], 'cursor': row[3]}
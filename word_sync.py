@@ -0,0 +1,238 @@
+import hashlib
+import os
+import sqlite3
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+# Configuration
+TABLE_NAME = 'bee_words'
+MANIFEST_TABLE = 'sync_manifest'
+# Bump whenever the layout of TABLE_NAME changes; a mismatch forces a rebuild
+SCHEMA_VERSION = 2
+# Columns taken from the spreadsheet; the rest of the table is derived from them at ingest
+WORD_COLUMNS = ('word', 'year', 'difficulty', 'list')
+TABLE_COLUMNS = ('id', 'word', 'clean_word', 'spelling_key', 'year', 'difficulty', 'list')
+NULL_MARKERS = (None, 'nan', 'None', '')
+
+
+def clean_word(word):
+    """Display form of a word: markup removed and whitespace collapsed."""
+    return " ".join(str(word).replace('**', '').split())
+
+
+def spelling_key(word):
+    """Form used to compare spellings: lowercase with all spaces removed."""
+    return clean_word(word).lower().replace(" ", "")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ensure_manifest_table(conn):
+    """One manifest row per word table, naming the workbook the table currently mirrors."""
+    columns = [r[1] for r in conn.execute(f"PRAGMA table_info({MANIFEST_TABLE})")]
+    if columns and 'table_name' not in columns:
+        # Older manifests were keyed by workbook; they are only a cache, so start over
+        conn.execute(f"DROP TABLE {MANIFEST_TABLE}")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            file_hash TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime INTEGER NOT NULL,
+            schema_version INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            synced_at REAL NOT NULL
+        )
+    """)
+
+
+def read_manifest(conn, table=TABLE_NAME):
+    """Returns the manifest row of `table` (its last sync) as a dict, or None."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {MANIFEST_TABLE} WHERE table_name = ?", (table,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([d[0] for d in cursor.description], row))
+    except sqlite3.OperationalError:
+        return None
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _has_current_layout(conn):
+    columns = [r[1] for r in conn.execute(f"PRAGMA table_info({TABLE_NAME})")]
+    return tuple(columns) == TABLE_COLUMNS
+
+
+def read_excel_rows(excel_path):
+    """Parses the Excel word list into (word, year, difficulty, list) tuples."""
+    df = pd.read_excel(excel_path)
+
+    # Fuzzy match column names
+    col_map = {}
+    for col in df.columns:
+        c_clean = str(col).strip().lower()
+        if 'word' in c_clean: col_map['word'] = col
+        elif 'year' in c_clean: col_map['year'] = col
+        elif 'difficulty' in c_clean or 'level' in c_clean: col_map['difficulty'] = col
+        elif 'list' in c_clean: col_map['list'] = col
+
+    print(f"Detected columns: {col_map}")
+    if 'word' not in col_map:
+        return []
+
+    columns = {}
+    for name in WORD_COLUMNS:
+        if name in col_map:
+            columns[name] = df[col_map[name]].astype(str).str.strip()
+
+    rows = []
+    for values in zip(*[columns.get(name, [None] * len(df)) for name in WORD_COLUMNS]):
+        word = values[0]
+        # Drop empty words and 'nan' strings
+        if not clean_word(word) or clean_word(word).lower() == 'nan':
+            continue
+        # Normalize 'nan'/'None' in metadata columns to NULL
+        meta = tuple(None if v in NULL_MARKERS else v for v in values[1:])
+        rows.append((word,) + meta)
+    return rows
+
+
+def _create_table(conn, name):
+    conn.execute(f"""
+        CREATE TABLE {name} (
+            -- AUTOINCREMENT so ids of deleted words are never handed to new ones
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            word TEXT NOT NULL,
+            clean_word TEXT NOT NULL,
+            spelling_key TEXT NOT NULL,
+            year TEXT,
+            difficulty TEXT,
+            list TEXT
+        )
+    """)
+
+
+def _create_indexes(conn):
+    # (year, list, difficulty) serves year and year+list prefixes; the others cover
+    # filters that start from list or difficulty alone
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_year_list_difficulty ON {TABLE_NAME} (year, list, difficulty)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_list_difficulty ON {TABLE_NAME} (list, difficulty)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_difficulty ON {TABLE_NAME} (difficulty)")
+
+
+def _insert_rows(conn, table, rows):
+    conn.executemany(
+        f"INSERT INTO {table} (word, clean_word, spelling_key, year, difficulty, list) "
+        f"VALUES (?, ?, ?, ?, ?, ?)",
+        ((word, clean_word(word), spelling_key(word), year, difficulty, list_name)
+         for word, year, difficulty, list_name in rows)
+    )
+
+
+def _apply_diff(conn, rows):
+    """Deletes rows that disappeared and inserts new ones. Returns (inserted, deleted)."""
+    wanted = defaultdict(int)
+    for row in rows:
+        wanted[row] += 1
+
+    stale = []
+    for word_id, *values in conn.execute(f"SELECT id, {', '.join(WORD_COLUMNS)} FROM {TABLE_NAME}"):
+        key = tuple(values)
+        if wanted.get(key, 0) > 0:
+            wanted[key] -= 1
+        else:
+            stale.append((word_id,))
+
+    added = [row for row, count in wanted.items() for _ in range(count)]
+    conn.executemany(f"DELETE FROM {TABLE_NAME} WHERE id = ?", stale)
+    _insert_rows(conn, TABLE_NAME, added)
+    return len(added), len(stale)
+
+
+def _rebuild(conn, rows):
+    """Builds the table under a temporary name and swaps it in, all inside the caller's transaction."""
+    staging = f"{TABLE_NAME}_staging"
+    conn.execute(f"DROP TABLE IF EXISTS {staging}")
+    _create_table(conn, staging)
+    _insert_rows(conn, staging, rows)
+    conn.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    conn.execute(f"ALTER TABLE {staging} RENAME TO {TABLE_NAME}")
+    _create_indexes(conn)
+
+
+def sync_excel_to_db(excel_path, db_file, force=False):
+    """Syncs the Excel word list into SQLite, skipping the import when the file is unchanged.
+
+    Returns True if the word table was modified.
+    """
+    source = os.path.abspath(excel_path)
+    stat = os.stat(excel_path)
+    # Autocommit mode so the BEGIN/COMMIT below also cover the DDL statements
+    conn = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    try:
+        ensure_manifest_table(conn)
+        # The table mirrors one workbook; syncing another one diffs the table over to its rows
+        manifest = read_manifest(conn)
+        schema_ok = (manifest is not None and manifest['schema_version'] == SCHEMA_VERSION
+                     and _table_exists(conn, TABLE_NAME))
+        same_source = schema_ok and manifest['source'] == source
+
+        if not force and same_source and manifest['file_size'] == stat.st_size \
+                and manifest['file_mtime'] == stat.st_mtime_ns:
+            print(f"{excel_path} unchanged since last sync ({manifest['row_count']} words).")
+            return False
+
+        file_hash = file_sha256(excel_path)
+        if not force and same_source and manifest['file_hash'] == file_hash:
+            # Touched but not edited: just remember the new mtime
+            conn.execute(
+                f"UPDATE {MANIFEST_TABLE} SET file_size = ?, file_mtime = ? WHERE table_name = ?",
+                (stat.st_size, stat.st_mtime_ns, TABLE_NAME)
+            )
+            print(f"{excel_path} content unchanged, skipping sync.")
+            return False
+
+        print(f"Syncing {excel_path} to database...")
+        rows = read_excel_rows(excel_path)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A table written before the manifest existed can be diffed if its layout matches
+            if schema_ok or (manifest is None and _table_exists(conn, TABLE_NAME) and _has_current_layout(conn)):
+                inserted, deleted = _apply_diff(conn, rows)
+                print(f"Incremental sync: {inserted} added, {deleted} removed.")
+            else:
+                _rebuild(conn, rows)
+                print("Rebuilt word table.")
+            conn.execute(
+                f"INSERT OR REPLACE INTO {MANIFEST_TABLE} "
+                f"(table_name, source, file_hash, file_size, file_mtime, schema_version, row_count, synced_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (TABLE_NAME, source, file_hash, stat.st_size, stat.st_mtime_ns, SCHEMA_VERSION, len(rows),
+                 time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(f"Sync complete. Stored {len(rows)} words.")
+        return True
+    finally:
+        conn.close()